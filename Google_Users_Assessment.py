@@ -21,19 +21,237 @@ python google_user_assessment.py
 """
 
 import os
+import csv
 import json
+import gzip
+import logging
 import datetime
 import argparse
 import time
+import random
+import threading
 from typing import Dict, Any, List
 
 import pandas as pd
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
+from googleapiclient.errors import HttpError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Per-user progress messages, shown with --verbose
+logger = logging.getLogger(__name__)
+
+# Reports API requests sent per batch HTTP round trip
+BATCH_SIZE = 50
+
+# HTTP statuses that are retried with exponential backoff
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+
+# Usage reports per page when fetching the whole domain with userKey=all
+DOMAIN_REPORT_PAGE_SIZE = 1000
+
+# Users per page of the email and suspended-status listing merged with the domain report
+USER_STATUS_PAGE_SIZE = 500
+
+# Cached usage reports older than this are deleted at startup
+REPORT_CACHE_MAX_AGE_DAYS = 14
+
+# Sustained request rate, kept below the Reports API per-user quota
+DEFAULT_REQUESTS_PER_SECOND = 20
+
+# Column layout of the per-user statistics rows
+STATS_COLUMNS = [
+    ('Email', 'string'),
+    ('Gmail_Storage_MB', 'float64'),
+    ('Gmail_Emails_Received', 'int64'),
+    ('Gmail_Emails_Sent', 'int64'),
+    ('Gmail_Emails_Exchanged', 'int64'),
+    ('Is_Gmail_Enabled', 'bool'),
+    ('Has_Gmail_Data', 'bool'),
+    ('Drive_Storage_MB', 'float64'),
+    ('Drive_Item_Count', 'int64'),
+    ('Has_Drive_Data', 'bool'),
+    ('Total_Storage_MB', 'float64'),
+    ('Parameter_Source', 'string')
+]
+STATS_FIELDS = [name for name, _ in STATS_COLUMNS]
+
+# Drive item counts per document type, summed into the total item count
+_DOC_TYPE_PARAMS = frozenset([
+    'drive:num_owned_google_documents_created',
+    'drive:num_owned_google_spreadsheets_created',
+    'drive:num_owned_google_presentations_created',
+    'drive:num_owned_google_drawings_created',
+    'drive:num_owned_google_forms_created',
+    'drive:num_owned_other_types_created',
+    'docs:num_owned_google_documents_created',
+    'docs:num_owned_google_spreadsheets_created',
+    'docs:num_owned_google_presentations_created',
+    'docs:num_owned_google_drawings_created',
+    'docs:num_owned_google_forms_created',
+    'docs:num_owned_other_types_created'
+])
+
+# Drive storage parameter (already in MB)
+_DRIVE_STORAGE_PARAM = 'accounts:drive_used_quota_in_mb'
+
+# Gmail parameters: name -> stats field
+_GMAIL_PARAMS = {
+    'gmail:is_gmail_enabled': 'Is_Gmail_Enabled',
+    'accounts:gmail_used_quota_in_mb': 'Gmail_Storage_MB',
+    'gmail:num_emails_sent': 'Gmail_Emails_Sent',
+    'gmail:num_emails_received': 'Gmail_Emails_Received',
+    'gmail:num_emails_exchanged': 'Gmail_Emails_Exchanged'
+}
+
+# Turns a user email into a file name prefix
+_AT_TABLE = str.maketrans('@', '_')
+
+# Only these parameters are requested from the Reports API
+REQUIRED_PARAMS = ','.join(
+    [_DRIVE_STORAGE_PARAM] + list(_GMAIL_PARAMS) + sorted(_DOC_TYPE_PARAMS))
+
+
+class RateLimiter:
+    """Thread-safe token bucket that limits how often API calls can start.
+    
+    The bucket holds at least one token, so a rate below one per second
+    still lets a call through every 1/rate seconds.
+    """
+    
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def positive_rate(value: str) -> float:
+    """argparse type for a per-second rate, which must be greater than zero."""
+    rate = float(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than zero, got {value}")
+    return rate
+
+
+def _retry_after_seconds(error) -> float:
+    """Seconds requested by the Retry-After header of an HttpError, or 0."""
+    try:
+        return float(error.resp.get('retry-after', 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0
+
+
+def _retry_delay(attempt: int, retry_after: float = 0) -> float:
+    """Exponential backoff with jitter, honoring a Retry-After delay when longer."""
+    return max(2 ** attempt, retry_after) + random.random()
+
+
+def _iter_report_parameters(report: Dict[str, Any]):
+    """Yield every parameter object of a userUsageReport response."""
+    for usage_report in report.get('usageReports', []):
+        yield from usage_report.get('parameters', [])
+
+
+def _dump_json(data, indent: bool = False) -> bytes:
+    """Serialize data to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None).encode('utf-8')
+
+
+def _set_drive_storage(stats: Dict[str, Any], value):
+    """Store the Drive storage in MB when the user has any."""
+    if value > 0:
+        stats['Drive_Storage_MB'] = value
+        stats['Has_Drive_Data'] = True
+
+
+def _add_drive_items(stats: Dict[str, Any], value):
+    """Add one document type count to the Drive item count."""
+    if value > 0:
+        stats['Drive_Item_Count'] += value
+        stats['Has_Drive_Data'] = True
+
+
+def _gmail_handler(field: str):
+    """Build a handler that stores a Gmail parameter in its stats field."""
+    def handle(stats: Dict[str, Any], value):
+        stats[field] = value
+        if field != 'Is_Gmail_Enabled':
+            stats['Has_Gmail_Data'] = True
+    return handle
+
+
+# Parameter name -> handler that folds its value into a stats row
+_HANDLERS = {_DRIVE_STORAGE_PARAM: _set_drive_storage}
+_HANDLERS.update((name, _add_drive_items) for name in _DOC_TYPE_PARAMS)
+_HANDLERS.update((name, _gmail_handler(field)) for name, field in _GMAIL_PARAMS.items())
+
+
+def _classify_parameters(parameters: Dict[str, Any], stats: Dict[str, Any]):
+    """
+    Fill the Gmail and Drive fields of a stats row in a single pass over the parameters.
+    
+    Values are already typed by _parse_parameters; only numeric and boolean
+    values are used, so a missing or unexpected value is skipped.
+    
+    Args:
+        parameters: Dict of parameters from Reports API
+        stats: Stats row to update in place
+    """
+    for param_name, param_value in parameters.items():
+        handler = _HANDLERS.get(param_name)
+        if handler is not None and isinstance(param_value, (int, float)):
+            handler(stats, param_value)
+    
+    # If we don't have exchanged count but have sent and received, calculate it
+    if stats['Gmail_Emails_Exchanged'] == 0:
+        stats['Gmail_Emails_Exchanged'] = stats['Gmail_Emails_Sent'] + stats['Gmail_Emails_Received']
+    
+    stats['Total_Storage_MB'] = stats['Gmail_Storage_MB'] + stats['Drive_Storage_MB']
+
 
 class WorkspaceStatsCollector:
     def __init__(self, domain: str, service_account_file: str, 
-                 admin_email: str, output_dir: str = 'workspace_stats'):
+                 admin_email: str, output_dir: str = 'workspace_stats',
+                 use_cache: bool = True,
+                 parquet_output: bool = False, debug_mode: bool = False,
+                 compress_debug: bool = False,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND):
         """
         Initialize Workspace Statistics collection tool.
         
@@ -42,19 +260,38 @@ class WorkspaceStatsCollector:
             service_account_file: Service account credentials file path
             admin_email: Admin email for domain-wide delegation
             output_dir: Directory to save exported data
+            use_cache: Reuse usage reports cached on disk by previous runs
+            parquet_output: Also stream statistics to a Parquet file (requires pyarrow)
+            debug_mode: Save raw reports and parsed parameters for every user
+            compress_debug: Gzip the debug files written in debug mode
+            requests_per_second: Maximum sustained rate of API requests
         """
+        if parquet_output and pq is None:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+        
         self.domain = domain
         self.service_account_file = service_account_file
         self.admin_email = admin_email
         self.output_dir = output_dir
         self.raw_data_dir = os.path.join(output_dir, "raw_data")
+        self.cache_dir = os.path.join(output_dir, "report_cache")
         self.creds = None
         self.services = {}
-        self.debug_mode = True
+        self.debug_mode = debug_mode
+        self.compress_debug = compress_debug
+        self.parameter_filter = REQUIRED_PARAMS
+        self.use_cache = use_cache
+        self.parquet_output = parquet_output
+        self._limiter = RateLimiter(requests_per_second)
+        
+        # Set report date to 3 days ago to ensure data availability
+        self.report_date = (datetime.datetime.now() - datetime.timedelta(days=3)).strftime('%Y-%m-%d')
         
         # Create output directories
         os.makedirs(output_dir, exist_ok=True)
         os.makedirs(self.raw_data_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._prune_report_cache()
     
     def authenticate(self):
         """Authenticate with Google Workspace APIs."""
@@ -76,360 +313,183 @@ class WorkspaceStatsCollector:
     def initialize_services(self):
         """Initialize Google Workspace API services."""
         try:
-            self.services['directory'] = build('admin', 'directory_v1', credentials=self.creds)
-            self.services['reports'] = build('admin', 'reports_v1', credentials=self.creds)
+            self.services['directory'] = build('admin', 'directory_v1', credentials=self.creds,
+                                               static_discovery=True, cache_discovery=False)
+            self.services['reports'] = build('admin', 'reports_v1', credentials=self.creds,
+                                             static_discovery=True, cache_discovery=False)
             print("Services initialized successfully")
         except Exception as e:
             print(f"Error initializing services: {e}")
             raise
     
-    def get_all_parameters(self, user_email: str) -> Dict[str, Any]:
+    def _prune_report_cache(self):
+        """Delete cached usage reports written more than REPORT_CACHE_MAX_AGE_DAYS ago."""
+        cutoff = time.time() - REPORT_CACHE_MAX_AGE_DAYS * 86400
+        removed = 0
+        for entry in os.scandir(self.cache_dir):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError as e:
+                print(f"Could not remove old cache entry {entry.path}: {e}")
+        if removed:
+            print(f"Removed {removed} cached reports older than {REPORT_CACHE_MAX_AGE_DAYS} days")
+    
+    def _report_cache_path(self, user_email: str, report_date: str) -> str:
+        """Path of the cached usage report for a user and report date."""
+        return os.path.join(self.cache_dir, f"{user_email.translate(_AT_TABLE)}_{report_date}.json")
+    
+    def _load_cached_parameters(self, user_email: str, report_date: str):
         """
-        Get all available parameters for a user from the Reports API.
+        Load the parameters of a usage report cached by a previous run.
+        
+        Reports for a past date do not change, so a cached copy for the same
+        user and date can be reused instead of calling the API again. When
+        ijson is installed only the parameter objects are parsed from the file.
         
-        Args:
-            user_email: Email of the user to check
-            
         Returns:
-            Dict of all parameters and their values
+            Dict of parameters, or None if there is no usable cache entry
         """
-        # Set report date to 3 days ago to ensure data availability
-        report_date = (datetime.datetime.now() - datetime.timedelta(days=3)).strftime('%Y-%m-%d')
+        if not self.use_cache:
+            return None
+        
+        cache_path = self._report_cache_path(user_email, report_date)
+        if not os.path.exists(cache_path):
+            return None
         
         try:
-            # Try a general request without specifying parameters
-            report = self.services['reports'].userUsageReport().get(
-                userKey=user_email,
-                date=report_date
-            ).execute()
-            
-            # Save raw response for debugging
-            if self.debug_mode:
-                with open(os.path.join(self.raw_data_dir, f"{user_email.replace('@', '_')}_raw.json"), 'w') as f:
-                    json.dump(report, f, indent=2)
-            
-            parameters = {}
-            
-            # Process all parameters in the response
-            for usage_report in report.get('usageReports', []):
-                # Get parameters
-                for param in usage_report.get('parameters', []):
-                    param_name = param.get('name', '')
-                    
-                    # Extract value based on type
-                    if 'stringValue' in param:
-                        parameters[param_name] = param['stringValue']
-                    elif 'intValue' in param:
-                        parameters[param_name] = int(param['intValue'])
-                    elif 'boolValue' in param:
-                        parameters[param_name] = param['boolValue']
-                    else:
-                        parameters[param_name] = None
-            
-            # Save the parameters to a file for analysis
-            with open(os.path.join(self.raw_data_dir, f"{user_email.replace('@', '_')}_parameters.json"), 'w') as f:
-                json.dump(parameters, f, indent=2)
-            
-            print(f"Found {len(parameters)} parameters for user {user_email}")
-            return parameters
-            
-        except Exception as e:
-            print(f"Error getting parameters for {user_email}: {e}")
-            return {}
+            with open(cache_path, 'rb') as f:
+                if ijson is not None:
+                    return self._parse_parameters(
+                        user_email, ijson.items(f, 'usageReports.item.parameters.item'))
+                report = orjson.loads(f.read()) if orjson is not None else json.load(f)
+            return self._parse_parameters(user_email, _iter_report_parameters(report))
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache entry {cache_path}: {e}")
+            return None
+    
+    def _save_cached_report(self, user_email: str, report_date: str, report: Dict[str, Any]):
+        """
+        Atomically write a usage report to the on-disk cache.
+        
+        Reports with warnings or without usage data are not cached, since
+        the data for that date may not be complete yet.
+        """
+        if report.get('warnings') or not report.get('usageReports'):
+            return
+        
+        cache_path = self._report_cache_path(user_email, report_date)
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_dump_json(report))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Could not cache report for {user_email}: {e}")
+    
+    def _usage_report_request(self, service, user_key: str, report_date: str, **kwargs):
+        """Build a userUsageReport request limited to the parameters this script reads."""
+        if self.parameter_filter:
+            kwargs['parameters'] = self.parameter_filter
+        return service.userUsageReport().get(
+            userKey=user_key,
+            date=report_date,
+            **kwargs
+        )
     
-    def get_drive_item_count(self, parameters: Dict[str, Any]) -> int:
+    def _disable_parameter_filter(self, error, filtered: bool) -> bool:
         """
-        Extract Drive item count from parameters with special handling.
+        Stop filtering report parameters after the API rejected the filter.
         
         Args:
-            parameters: Dict of parameters from Reports API
+            error: Exception raised by a userUsageReport request
+            filtered: Whether the failed request was sent with the parameter filter
             
         Returns:
-            Total Drive item count
+            True if the request failed because of the filter and should be retried
         """
-        # Initialize count
-        total_items = 0
-        
-        # List of possible item count parameters, in order of preference
-        item_count_params = [
-            'num_items',             # Total items
-            'num_docs',              # Google Docs
-            'num_sheets',            # Google Sheets 
-            'num_slides',            # Google Slides
-            'num_drawings',          # Google Drawings
-            'num_forms',             # Google Forms
-            'num_files',             # Regular files
-            'num_folders',           # Folders
-            'drive_num_items',       # Alternative parameter
-            'doc_count',             # Alternative parameter
-            'drive_file_count',      # Alternative parameter
-            'total_doc_count'        # Alternative parameter
-        ]
-        
-        # Look for a single comprehensive parameter first
-        for param in item_count_params:
-            if param in parameters:
-                try:
-                    value = int(parameters[param])
-                    if value > 0:
-                        print(f"Found item count from parameter '{param}': {value}")
-                        return value
-                except (ValueError, TypeError):
-                    continue
-        
-        # If no single parameter works, try to sum the specific document type counts
-        doc_type_params = [
-            'drive:num_owned_google_documents_created',
-            'drive:num_owned_google_spreadsheets_created', 
-            'drive:num_owned_google_presentations_created',
-            'drive:num_owned_google_drawings_created',
-            'drive:num_owned_google_forms_created',
-            'drive:num_owned_other_types_created',
-            'docs:num_owned_google_documents_created',
-            'docs:num_owned_google_spreadsheets_created', 
-            'docs:num_owned_google_presentations_created',
-            'docs:num_owned_google_drawings_created',
-            'docs:num_owned_google_forms_created',
-            'docs:num_owned_other_types_created'
-        ]
-        
-        # Get counts for each document type
-        type_counts = {}
-        for param in doc_type_params:
-            if param in parameters:
-                try:
-                    value = int(parameters[param])
-                    type_counts[param] = value
-                    total_items += value
-                except (ValueError, TypeError):
-                    continue
-        
-        # Log the breakdown if we found multiple types
-        if type_counts and total_items > 0:
-            print(f"Calculated item count by summing: {type_counts}")
-            print(f"Total items: {total_items}")
-            return total_items
-        
-        # As a fallback, look for any parameter with "count" or "items" in the name
-        if total_items == 0:
-            for param_name, param_value in parameters.items():
-                if any(x in param_name.lower() for x in ['count', 'items', 'docs']):
-                    try:
-                        value = int(param_value)
-                        if value > 0 and 'drive' in param_name.lower():
-                            print(f"Found item count from fallback parameter '{param_name}': {value}")
-                            return value
-                    except (ValueError, TypeError):
-                        continue
-        
-        return total_items
+        if not (filtered and isinstance(error, HttpError) and error.resp.status == 400):
+            return False
+        if self.parameter_filter:
+            print(f"Reports API rejected the parameter filter, requesting all parameters: {error}")
+            self.parameter_filter = None
+        return True
     
-    def get_drive_storage(self, parameters: Dict[str, Any]) -> float:
+    def _extract_parameters(self, user_email: str, report: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Extract Drive storage from parameters.
+        Extract all parameters from a userUsageReport response.
         
         Args:
-            parameters: Dict of parameters from Reports API
+            user_email: Email of the user the report belongs to
+            report: Raw response from the Reports API
             
         Returns:
-            Drive storage in MB
+            Dict of all parameters and their values
         """
-        # Initialize storage
-        storage_mb = 0
+        # Save raw response for debugging
+        if self.debug_mode:
+            self._write_debug_json(f"{user_email.translate(_AT_TABLE)}_raw.json", report)
         
-        # Check for accounts:drive_used_quota_in_mb first (based on JSON samples)
-        if 'accounts:drive_used_quota_in_mb' in parameters:
-            try:
-                value = float(parameters['accounts:drive_used_quota_in_mb'])
-                print(f"Found Drive storage from parameter 'accounts:drive_used_quota_in_mb': {value:.2f} MB")
-                return value
-            except (ValueError, TypeError):
-                pass
-        
-        # List of possible storage parameters, in order of preference
-        storage_params = [
-            'drive_storage_bytes_used',
-            'storage_quota_bytes',
-            'used_quota_in_mb',
-            'quota_used',
-            'storage_quota_mb',
-            'drive_storage_used',
-            'total_storage_used'
-        ]
-        
-        # Try each parameter
-        for param in storage_params:
-            if param in parameters:
-                try:
-                    value = float(parameters[param])
-                    
-                    # Convert to MB if needed
-                    if 'bytes' in param.lower() or value > 1000000:
-                        value = value / (1024 * 1024)
-                    
-                    print(f"Found Drive storage from parameter '{param}': {value:.2f} MB")
-                    return value
-                except (ValueError, TypeError):
-                    continue
-        
-        # Fallback: look for any parameter with storage-related terms
-        for param_name, param_value in parameters.items():
-            if any(x in param_name.lower() for x in ['storage', 'quota', 'byte']):
-                try:
-                    value = float(param_value)
-                    
-                    # Convert to MB if needed
-                    if 'bytes' in param_name.lower() or value > 1000000:
-                        value = value / (1024 * 1024)
-                    
-                    if value > 0 and 'drive' in param_name.lower():
-                        print(f"Found Drive storage from fallback parameter '{param_name}': {value:.2f} MB")
-                        return value
-                except (ValueError, TypeError):
-                    continue
-        
-        return storage_mb
+        return self._parse_parameters(user_email, _iter_report_parameters(report))
     
-    def get_gmail_statistics(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+    def _parse_parameters(self, user_email: str, raw_parameters) -> Dict[str, Any]:
         """
-        Extract Gmail statistics from parameters.
+        Convert raw report parameter objects into a dict of typed values.
         
         Args:
-            parameters: Dict of parameters from Reports API
+            user_email: Email of the user the parameters belong to
+            raw_parameters: Iterable of parameter objects from a usage report
             
         Returns:
-            Dict with Gmail statistics
+            Dict of all parameters and their values
         """
-        # Initialize Gmail stats
-        gmail_stats = {
-            'Gmail_Storage_MB': 0,
-            'Gmail_Emails_Received': 0,
-            'Gmail_Emails_Sent': 0,
-            'Gmail_Emails_Exchanged': 0,
-            'Is_Gmail_Enabled': True,
-            'Has_Gmail_Data': False
-        }
-        
-        # Check if Gmail is enabled
-        gmail_status_params = ['gmail:is_gmail_enabled', 'is_gmail_enabled', 'gmail_enabled', 'has_gmail']
-        for param in gmail_status_params:
-            if param in parameters:
-                try:
-                    gmail_stats['Is_Gmail_Enabled'] = bool(parameters[param])
-                    print(f"Gmail enabled status from parameter '{param}': {gmail_stats['Is_Gmail_Enabled']}")
-                    break
-                except (ValueError, TypeError):
-                    continue
+        parameters = {}
         
-        # Get Gmail storage
-        if 'accounts:gmail_used_quota_in_mb' in parameters:
-            try:
-                value = float(parameters['accounts:gmail_used_quota_in_mb'])
-                gmail_stats['Gmail_Storage_MB'] = value
-                gmail_stats['Has_Gmail_Data'] = True
-                print(f"Gmail storage from parameter 'accounts:gmail_used_quota_in_mb': {value:.2f} MB")
-            except (ValueError, TypeError):
-                pass
-        else:
-            # Try other parameter names
-            gmail_storage_params = [
-                'gmail_used_quota_in_mb',
-                'gmail_storage_used',
-                'gmail_quota_used',
-                'gmail_storage_bytes_used'
-            ]
+        for param in raw_parameters:
+            param_name = param.get('name', '')
             
-            for param in gmail_storage_params:
-                if param in parameters:
-                    try:
-                        value = float(parameters[param])
-                        
-                        # Convert to MB if needed
-                        if 'bytes' in param.lower() or value > 1000000:
-                            value = value / (1024 * 1024)
-                        
-                        gmail_stats['Gmail_Storage_MB'] = value
-                        gmail_stats['Has_Gmail_Data'] = True
-                        print(f"Gmail storage from parameter '{param}': {value:.2f} MB")
-                        break
-                    except (ValueError, TypeError):
-                        continue
-            
-            # Fallback for Gmail storage
-            if gmail_stats['Gmail_Storage_MB'] == 0:
-                for param_name, param_value in parameters.items():
-                    if any(x in param_name.lower() for x in ['storage', 'quota', 'byte']) and 'gmail' in param_name.lower():
-                        try:
-                            value = float(param_value)
-                            
-                            # Convert to MB if needed
-                            if 'bytes' in param_name.lower() or value > 1000000:
-                                value = value / (1024 * 1024)
-                            
-                            if value > 0:
-                                gmail_stats['Gmail_Storage_MB'] = value
-                                gmail_stats['Has_Gmail_Data'] = True
-                                print(f"Gmail storage from fallback parameter '{param_name}': {value:.2f} MB")
-                                break
-                        except (ValueError, TypeError):
-                            continue
-        
-        # Get emails sent count
-        sent_params = ['gmail:num_emails_sent', 'num_emails_sent', 'emails_sent', 'sent_mail_count']
-        for param in sent_params:
-            if param in parameters:
-                try:
-                    value = int(parameters[param])
-                    gmail_stats['Gmail_Emails_Sent'] = value
-                    gmail_stats['Has_Gmail_Data'] = True
-                    print(f"Gmail sent emails from parameter '{param}': {value}")
-                    break
-                except (ValueError, TypeError):
-                    continue
-        
-        # Get emails received count
-        received_params = ['gmail:num_emails_received', 'num_emails_received', 'emails_received', 'received_mail_count']
-        for param in received_params:
-            if param in parameters:
-                try:
-                    value = int(parameters[param])
-                    gmail_stats['Gmail_Emails_Received'] = value
-                    gmail_stats['Has_Gmail_Data'] = True
-                    print(f"Gmail received emails from parameter '{param}': {value}")
-                    break
-                except (ValueError, TypeError):
-                    continue
-        
-        # Get emails exchanged count (total)
-        exchanged_params = ['gmail:num_emails_exchanged', 'num_emails_exchanged', 'emails_exchanged', 'total_mail_count']
-        for param in exchanged_params:
-            if param in parameters:
-                try:
-                    value = int(parameters[param])
-                    gmail_stats['Gmail_Emails_Exchanged'] = value
-                    gmail_stats['Has_Gmail_Data'] = True
-                    print(f"Gmail exchanged emails from parameter '{param}': {value}")
-                    break
-                except (ValueError, TypeError):
-                    continue
-        
-        # If we don't have exchanged count but have sent and received, calculate it
-        if gmail_stats['Gmail_Emails_Exchanged'] == 0 and (gmail_stats['Gmail_Emails_Sent'] > 0 or gmail_stats['Gmail_Emails_Received'] > 0):
-            gmail_stats['Gmail_Emails_Exchanged'] = gmail_stats['Gmail_Emails_Sent'] + gmail_stats['Gmail_Emails_Received']
-            print(f"Calculated Gmail exchanged emails: {gmail_stats['Gmail_Emails_Exchanged']}")
-        
-        return gmail_stats
+            # Extract value based on type
+            if 'stringValue' in param:
+                parameters[param_name] = param['stringValue']
+            elif 'intValue' in param:
+                parameters[param_name] = int(param['intValue'])
+            elif 'boolValue' in param:
+                parameters[param_name] = param['boolValue']
+            else:
+                parameters[param_name] = None
+        
+        # Save the parameters to a file for analysis
+        if self.debug_mode:
+            self._write_debug_json(f"{user_email.translate(_AT_TABLE)}_parameters.json", parameters)
+        
+        logger.debug("Found %d parameters for user %s", len(parameters), user_email)
+        return parameters
+    
+    def _write_debug_json(self, filename: str, data):
+        """Write a debug JSON file to the raw data directory, gzipped if requested."""
+        path = os.path.join(self.raw_data_dir, filename)
+        if self.compress_debug:
+            with gzip.open(path + '.gz', 'wb', compresslevel=1) as f:
+                f.write(_dump_json(data, indent=True))
+        else:
+            with open(path, 'wb') as f:
+                f.write(_dump_json(data, indent=True))
     
-    def get_user_workspace_stats(self, user_email: str) -> Dict[str, Any]:
+    def get_user_workspace_stats(self, user: Dict[str, Any],
+                                 parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Get combined Gmail and Drive statistics for a user.
         
         Args:
-            user_email: Email of the user to check
+            user: User record from the Directory API users().list response
+            parameters: Report parameters already fetched for the user
             
         Returns:
             Dict with combined statistics
         """
+        user_email = user.get('primaryEmail', '')
+        
         # Initialize stats
         stats = {
             'Email': user_email,
@@ -450,46 +510,14 @@ class WorkspaceStatsCollector:
         }
         
         try:
-            # Check if the user exists and is active
-            try:
-                user_info = self.services['directory'].users().get(
-                    userKey=user_email
-                ).execute()
-                
-                if user_info.get('suspended', False):
-                    stats['Is_Gmail_Enabled'] = False
-                    print(f"User {user_email} is suspended")
-            except Exception as e:
-                print(f"Could not retrieve user information: {e}")
-            
-            # Get all parameters for the user
-            parameters = self.get_all_parameters(user_email)
+            # Check if the user is active
+            if user.get('suspended', False):
+                stats['Is_Gmail_Enabled'] = False
+                logger.debug("User %s is suspended", user_email)
+                return stats
             
             if parameters:
-                # Get Drive statistics
-                drive_storage = self.get_drive_storage(parameters)
-                if drive_storage > 0:
-                    stats['Drive_Storage_MB'] = drive_storage
-                    stats['Has_Drive_Data'] = True
-                
-                drive_items = self.get_drive_item_count(parameters)
-                if drive_items > 0:
-                    stats['Drive_Item_Count'] = drive_items
-                    stats['Has_Drive_Data'] = True
-                
-                # Get Gmail statistics
-                gmail_stats = self.get_gmail_statistics(parameters)
-                stats.update({
-                    'Gmail_Storage_MB': gmail_stats['Gmail_Storage_MB'],
-                    'Gmail_Emails_Received': gmail_stats['Gmail_Emails_Received'],
-                    'Gmail_Emails_Sent': gmail_stats['Gmail_Emails_Sent'],
-                    'Gmail_Emails_Exchanged': gmail_stats['Gmail_Emails_Exchanged'],
-                    'Is_Gmail_Enabled': gmail_stats['Is_Gmail_Enabled'],
-                    'Has_Gmail_Data': gmail_stats['Has_Gmail_Data']
-                })
-                
-                # Calculate total storage
-                stats['Total_Storage_MB'] = stats['Gmail_Storage_MB'] + stats['Drive_Storage_MB']
+                _classify_parameters(parameters, stats)
             
             return stats
             
@@ -497,88 +525,303 @@ class WorkspaceStatsCollector:
             print(f"Error getting workspace stats for {user_email}: {e}")
             return stats
     
+    def fetch_parameters_batch(self, user_emails: List[str], report_date: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch usage report parameters for several users using batch HTTP requests.
+        
+        Reports cached by a previous run are reused. Up to BATCH_SIZE
+        userUsageReport requests are sent per HTTP round trip for the rest.
+        Requests are paced by the token bucket, and requests that fail with a
+        retryable status are re-sent with exponential backoff. A batch that
+        fails as a whole is retried the same way for all of its users.
+        
+        Args:
+            user_emails: Emails of the users to fetch reports for
+            report_date: Report date in YYYY-MM-DD format
+            
+        Returns:
+            Dict mapping each user email to its parameters (empty dict on failure)
+        """
+        parameters_by_email = {}
+        pending = []
+        for email in user_emails:
+            cached = self._load_cached_parameters(email, report_date)
+            if cached is None:
+                pending.append(email)
+            else:
+                parameters_by_email[email] = cached
+        
+        if len(pending) < len(user_emails):
+            print(f"Loaded {len(user_emails) - len(pending)} reports from cache")
+        
+        attempt = 0
+        
+        while pending:
+            retry = []
+            retry_after = [0]
+            
+            for start in range(0, len(pending), BATCH_SIZE):
+                chunk = pending[start:start + BATCH_SIZE]
+                
+                filtered = bool(self.parameter_filter)
+                
+                def on_report(request_id, response, exception, chunk=chunk, filtered=filtered):
+                    email = chunk[int(request_id)]
+                    if exception is None:
+                        self._save_cached_report(email, report_date, response)
+                        parameters_by_email[email] = self._extract_parameters(email, response)
+                    elif self._disable_parameter_filter(exception, filtered) or (
+                            isinstance(exception, HttpError) and
+                            exception.resp.status in RETRYABLE_STATUSES and
+                            attempt < MAX_RETRIES):
+                        retry.append(email)
+                        retry_after[0] = max(retry_after[0], _retry_after_seconds(exception))
+                    else:
+                        print(f"Error getting parameters for {email}: {exception}")
+                        parameters_by_email[email] = {}
+                
+                batch = self.services['reports'].new_batch_http_request(callback=on_report)
+                for i, email in enumerate(chunk):
+                    self._limiter.acquire()
+                    batch.add(
+                        self._usage_report_request(self.services['reports'], email, report_date),
+                        request_id=str(i)
+                    )
+                try:
+                    batch.execute()
+                except HttpError as e:
+                    # A failed batch envelope means no request ran; retry the whole chunk
+                    if e.resp.status in RETRYABLE_STATUSES and attempt < MAX_RETRIES:
+                        retry.extend(chunk)
+                        retry_after[0] = max(retry_after[0], _retry_after_seconds(e))
+                    else:
+                        print(f"Error getting parameters for {len(chunk)} users: {e}")
+                        parameters_by_email.update((email, {}) for email in chunk)
+            
+            if retry:
+                delay = _retry_delay(attempt, retry_after[0])
+                print(f"Retrying {len(retry)} users in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+            pending = retry
+        
+        return parameters_by_email
+    
+    def _iter_directory_pages(self, max_users: int):
+        """
+        Yield users from the Directory API one page at a time with their report parameters.
+        
+        Args:
+            max_users: Maximum number of users to yield
+            
+        Yields:
+            Tuple of (users, parameters_by_email) for each page of users
+        """
+        user_count = 0
+        page_token = None
+        
+        while True:
+            # Get a batch of users
+            results = self.services['directory'].users().list(
+                customer='my_customer',
+                maxResults=100,
+                orderBy='email',
+                projection='basic',
+                pageToken=page_token,
+                fields='users(primaryEmail,suspended),nextPageToken'
+            ).execute()
+            
+            users = results.get('users', [])
+            if not users:
+                break
+            
+            print(f"Found {len(users)} users")
+            
+            # Only fetch reports for users within the limit
+            users = users[:max_users - user_count]
+            
+            # Fetch report parameters for the whole page in batches,
+            # skipping suspended users who have no activity to report
+            emails = [user.get('primaryEmail', '') for user in users if not user.get('suspended', False)]
+            yield users, self.fetch_parameters_batch(emails, self.report_date)
+            
+            user_count += len(users)
+            if user_count >= max_users:
+                print(f"Reached maximum user limit of {max_users}")
+                break
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+    
+    def _list_user_status(self) -> Dict[str, bool]:
+        """
+        List every user's email and suspended status from the Directory API.
+        
+        Returns:
+            Dict mapping each primary email to whether the user is suspended
+        """
+        statuses = {}
+        page_token = None
+        
+        while True:
+            results = self.services['directory'].users().list(
+                customer='my_customer',
+                maxResults=USER_STATUS_PAGE_SIZE,
+                projection='basic',
+                pageToken=page_token,
+                fields='users(primaryEmail,suspended),nextPageToken'
+            ).execute()
+            
+            for user in results.get('users', []):
+                statuses[user.get('primaryEmail', '')] = user.get('suspended', False)
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return statuses
+    
+    def _iter_domain_report_pages(self):
+        """
+        Yield the usage reports of every user in the domain one page at a time.
+        
+        A single paginated userKey=all request covers the whole domain, so
+        no per-user requests are needed. It is merged with a trimmed
+        Directory listing, which supplies each user's suspended status and
+        the users the report has no entry for; those are yielded last with
+        no parameters. Every report read is also written to the cache for
+        later runs with a user limit.
+        
+        Yields:
+            Tuple of (users, parameters_by_email) for each page of reports
+        """
+        statuses = self._list_user_status()
+        print(f"Found {len(statuses)} users in the directory")
+        
+        page_token = None
+        page_number = 0
+        attempt = 0
+        
+        while True:
+            filtered = bool(self.parameter_filter)
+            self._limiter.acquire()
+            try:
+                report = self._usage_report_request(
+                    self.services['reports'], 'all', self.report_date,
+                    maxResults=DOMAIN_REPORT_PAGE_SIZE, pageToken=page_token
+                ).execute()
+            except HttpError as e:
+                if self._disable_parameter_filter(e, filtered):
+                    continue
+                if e.resp.status not in RETRYABLE_STATUSES or attempt >= MAX_RETRIES:
+                    raise
+                delay = _retry_delay(attempt, _retry_after_seconds(e))
+                print(f"Retrying usage report page in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            
+            attempt = 0
+            page_number += 1
+            if self.debug_mode:
+                self._write_debug_json(f"usage_reports_{self.report_date}_{page_number}_raw.json", report)
+            
+            users = []
+            parameters_by_email = {}
+            for usage_report in report.get('usageReports', []):
+                email = usage_report.get('entity', {}).get('userEmail', '')
+                users.append({'primaryEmail': email, 'suspended': statuses.pop(email, False)})
+                parameters_by_email[email] = self._parse_parameters(email, usage_report.get('parameters', []))
+                if not report.get('warnings'):
+                    self._save_cached_report(email, self.report_date, {'usageReports': [usage_report]})
+            
+            print(f"Found usage reports for {len(users)} users")
+            yield users, parameters_by_email
+            
+            page_token = report.get('nextPageToken')
+            if not page_token:
+                break
+        
+        # Users without a usage report still get a row
+        if statuses:
+            print(f"Found {len(statuses)} users without usage reports")
+            yield [{'primaryEmail': email, 'suspended': suspended} for email, suspended in statuses.items()], {}
+    
     def collect_workspace_stats(self, max_users=10):
         """
         Collect workspace statistics for users.
         
+        With no user limit, the usage reports of the whole domain are read
+        with userKey=all. Otherwise users are listed from the Directory API
+        and their reports are fetched in batches.
+        
         Args:
-            max_users: Maximum number of users to process
+            max_users: Maximum number of users to process (0 for all)
             
         Returns:
             DataFrame with workspace statistics
         """
-        stats_list = []
-        user_count = 0
-        page_token = None
+        # Column-oriented storage: one list per field instead of one dict per user
+        stats_columns = {name: [] for name in STATS_FIELDS}
+        record_count = 0
+        parquet_writer = None
+        
+        # Rows are appended to the CSV as they are produced
+        csv_path = os.path.join(self.output_dir, "workspace_stats_complete.csv")
+        csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+        csv_writer = csv.DictWriter(csv_file, fieldnames=STATS_FIELDS)
+        csv_writer.writeheader()
+        
+        if max_users > 0:
+            pages = self._iter_directory_pages(max_users)
+        else:
+            pages = self._iter_domain_report_pages()
         
         try:
-            while True:
-                # Get a batch of users
-                results = self.services['directory'].users().list(
-                    customer='my_customer',
-                    maxResults=100,
-                    orderBy='email',
-                    pageToken=page_token,
-                    fields='users(primaryEmail,suspended),nextPageToken'
-                ).execute()
-                
-                users = results.get('users', [])
-                if not users:
-                    break
-                
-                print(f"Found {len(users)} users")
-                
-                # Process users
+            for users, parameters_by_email in pages:
+                # Reports were already fetched for the page, so this is only classification
+                page_stats = []
                 for i, user in enumerate(users):
-                    email = user.get('primaryEmail', '')
-                    print(f"\nProcessing user {i+1}/{len(users)}: {email}")
-                    
-                    # Get workspace stats
-                    workspace_stats = self.get_user_workspace_stats(email)
-                    stats_list.append(workspace_stats)
-                    
-                    user_count += 1
-                    if user_count >= max_users and max_users > 0:
-                        print(f"Reached maximum user limit of {max_users}")
-                        break
-                    
-                    # Small delay to avoid rate limiting
-                    time.sleep(1)
-                
-                if user_count >= max_users and max_users > 0:
-                    break
+                    workspace_stats = self.get_user_workspace_stats(
+                        user, parameters_by_email.get(user.get('primaryEmail', ''), {}))
+                    logger.debug("Processed user %d/%d: %s", i + 1, len(users), workspace_stats['Email'])
+                    page_stats.append(workspace_stats)
+                    csv_writer.writerow(workspace_stats)
+                for name, values in stats_columns.items():
+                    values.extend(row[name] for row in page_stats)
+                record_count += len(page_stats)
                 
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
+                # One write syscall per page instead of one per row
+                csv_file.flush()
                 
-                # Save intermediate results
-                if len(stats_list) % 10 == 0:
-                    self._save_to_csv(stats_list, f"workspace_stats_partial_{len(stats_list)}.csv")
-            
-            # Save final results
-            self._save_to_csv(stats_list, "workspace_stats_complete.csv")
+                # Stream the page to Parquet as one row group
+                if self.parquet_output and page_stats:
+                    if parquet_writer is None:
+                        parquet_writer = self._open_parquet_writer("workspace_stats_complete.parquet")
+                    self._write_parquet_rows(parquet_writer, page_stats)
             
-            return pd.DataFrame(stats_list)
+            return pd.DataFrame(stats_columns, columns=STATS_FIELDS)
             
         except Exception as e:
+            # Rows written so far are already in the CSV
             print(f"Error collecting workspace stats: {e}")
-            
-            # Save what we have
-            if stats_list:
-                self._save_to_csv(stats_list, "workspace_stats_error.csv")
-            
-            return pd.DataFrame(stats_list)
+            return pd.DataFrame(stats_columns, columns=STATS_FIELDS)
+        
+        finally:
+            csv_file.close()
+            print(f"Saved {record_count} records to {csv_path}")
+            if parquet_writer is not None:
+                parquet_writer.close()
+                print(f"Saved {record_count} records to {os.path.join(self.output_dir, 'workspace_stats_complete.parquet')}")
     
-    def _save_to_csv(self, data, filename):
-        """Helper method to save data to CSV."""
-        if data:
-            df = pd.DataFrame(data)
-            csv_path = os.path.join(self.output_dir, filename)
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Saved {len(data)} records to {csv_path}")
-        else:
-            print("No data to save")
+    def _open_parquet_writer(self, filename):
+        """Open a zstd-compressed Parquet writer using the statistics schema."""
+        schema = pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in STATS_COLUMNS])
+        parquet_path = os.path.join(self.output_dir, filename)
+        return pq.ParquetWriter(parquet_path, schema, compression='zstd')
+    
+    def _write_parquet_rows(self, writer, rows):
+        """Append statistics rows to an open Parquet writer as a single row group."""
+        writer.write_table(pa.Table.from_pylist(rows, schema=writer.schema))
 
 def main():
     parser = argparse.ArgumentParser(description='Combined Workspace Statistics Collector')
@@ -587,16 +830,32 @@ def main():
     parser.add_argument('--admin-email', required=True, help='Admin email for domain-wide delegation')
     parser.add_argument('--output-dir', default='workspace_stats', help='Directory to save exported data')
     parser.add_argument('--max-users', type=int, default=10, help='Maximum number of users to process (0 for all)')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore usage reports cached by previous runs')
+    parser.add_argument('--parquet', action='store_true',
+                        help='Also stream statistics to a zstd-compressed Parquet file (requires pyarrow)')
+    parser.add_argument('--debug', action='store_true', help='Save raw reports and parsed parameters for every user')
+    parser.add_argument('--compress-debug', action='store_true', help='Gzip the files written by --debug')
+    parser.add_argument('--requests-per-second', type=positive_rate, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help=f'Maximum sustained API request rate (default: {DEFAULT_REQUESTS_PER_SECOND})')
+    parser.add_argument('--verbose', action='store_true', help='Print progress messages for every user')
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    
     # Initialize and run collection
     try:
         collector = WorkspaceStatsCollector(
             domain=args.domain,
             service_account_file=args.service_account,
             admin_email=args.admin_email,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            use_cache=not args.no_cache,
+            parquet_output=args.parquet,
+            debug_mode=args.debug,
+            compress_debug=args.compress_debug,
+            requests_per_second=args.requests_per_second
         )
         
         # Authenticate and initialize services
@@ -610,41 +869,54 @@ def main():
         
         # Show summary
         if not df.empty:
+            # Count users above zero and aggregate each column in a single pass
+            positive = (df[['Gmail_Storage_MB', 'Gmail_Emails_Exchanged', 'Drive_Storage_MB',
+                            'Drive_Item_Count', 'Total_Storage_MB']] > 0).sum()
+            summary = df.agg({
+                'Has_Gmail_Data': ['sum'],
+                'Has_Drive_Data': ['sum'],
+                'Gmail_Storage_MB': ['sum', 'mean', 'max'],
+                'Gmail_Emails_Exchanged': ['sum', 'mean'],
+                'Drive_Storage_MB': ['sum', 'mean', 'max'],
+                'Drive_Item_Count': ['mean', 'max'],
+                'Total_Storage_MB': ['sum']
+            })
+            
             print("\nCollection completed successfully")
             print(f"Total users processed: {len(df)}")
-            print(f"Users with Gmail data: {df['Has_Gmail_Data'].sum()}")
-            print(f"Users with Drive data: {df['Has_Drive_Data'].sum()}")
+            print(f"Users with Gmail data: {int(summary.at['sum', 'Has_Gmail_Data'])}")
+            print(f"Users with Drive data: {int(summary.at['sum', 'Has_Drive_Data'])}")
             
             # Gmail stats
-            if len(df[df['Gmail_Storage_MB'] > 0]) > 0:
+            if positive['Gmail_Storage_MB'] > 0:
                 print(f"\nGmail Statistics:")
-                print(f"Users with Gmail storage > 0: {len(df[df['Gmail_Storage_MB'] > 0])}")
-                print(f"Average Gmail storage (MB): {df['Gmail_Storage_MB'].mean():.2f}")
-                print(f"Max Gmail storage (MB): {df['Gmail_Storage_MB'].max():.2f}")
-                print(f"Total Gmail storage (GB): {df['Gmail_Storage_MB'].sum() / 1024:.2f}")
+                print(f"Users with Gmail storage > 0: {positive['Gmail_Storage_MB']}")
+                print(f"Average Gmail storage (MB): {summary.at['mean', 'Gmail_Storage_MB']:.2f}")
+                print(f"Max Gmail storage (MB): {summary.at['max', 'Gmail_Storage_MB']:.2f}")
+                print(f"Total Gmail storage (GB): {summary.at['sum', 'Gmail_Storage_MB'] / 1024:.2f}")
                 
-                if len(df[df['Gmail_Emails_Exchanged'] > 0]) > 0:
-                    print(f"Users with Gmail activity: {len(df[df['Gmail_Emails_Exchanged'] > 0])}")
-                    print(f"Total emails exchanged: {df['Gmail_Emails_Exchanged'].sum()}")
-                    print(f"Average emails per user: {df['Gmail_Emails_Exchanged'].mean():.1f}")
+                if positive['Gmail_Emails_Exchanged'] > 0:
+                    print(f"Users with Gmail activity: {positive['Gmail_Emails_Exchanged']}")
+                    print(f"Total emails exchanged: {int(summary.at['sum', 'Gmail_Emails_Exchanged'])}")
+                    print(f"Average emails per user: {summary.at['mean', 'Gmail_Emails_Exchanged']:.1f}")
             
             # Drive stats
-            if len(df[df['Drive_Storage_MB'] > 0]) > 0:
+            if positive['Drive_Storage_MB'] > 0:
                 print(f"\nDrive Statistics:")
-                print(f"Users with Drive storage > 0: {len(df[df['Drive_Storage_MB'] > 0])}")
-                print(f"Average Drive storage (MB): {df['Drive_Storage_MB'].mean():.2f}")
-                print(f"Max Drive storage (MB): {df['Drive_Storage_MB'].max():.2f}")
-                print(f"Total Drive storage (GB): {df['Drive_Storage_MB'].sum() / 1024:.2f}")
+                print(f"Users with Drive storage > 0: {positive['Drive_Storage_MB']}")
+                print(f"Average Drive storage (MB): {summary.at['mean', 'Drive_Storage_MB']:.2f}")
+                print(f"Max Drive storage (MB): {summary.at['max', 'Drive_Storage_MB']:.2f}")
+                print(f"Total Drive storage (GB): {summary.at['sum', 'Drive_Storage_MB'] / 1024:.2f}")
                 
-                if len(df[df['Drive_Item_Count'] > 0]) > 0:
-                    print(f"Users with Drive items > 0: {len(df[df['Drive_Item_Count'] > 0])}")
-                    print(f"Average Drive item count: {df['Drive_Item_Count'].mean():.1f}")
-                    print(f"Max Drive item count: {df['Drive_Item_Count'].max()}")
+                if positive['Drive_Item_Count'] > 0:
+                    print(f"Users with Drive items > 0: {positive['Drive_Item_Count']}")
+                    print(f"Average Drive item count: {summary.at['mean', 'Drive_Item_Count']:.1f}")
+                    print(f"Max Drive item count: {int(summary.at['max', 'Drive_Item_Count'])}")
             
             # Combined stats
-            if len(df[df['Total_Storage_MB'] > 0]) > 0:
+            if positive['Total_Storage_MB'] > 0:
                 print(f"\nCombined Statistics:")
-                print(f"Total storage across all users (GB): {df['Total_Storage_MB'].sum() / 1024:.2f}")
+                print(f"Total storage across all users (GB): {summary.at['sum', 'Total_Storage_MB'] / 1024:.2f}")
         else:
             print("No data collected")
         
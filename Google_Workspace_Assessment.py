@@ -13,7 +13,7 @@ Requirements:
 - Python 3.7+
 - google-api-python-client
 - google-auth
-- pandas
+- pandas (optional, only for DataFrame results)
 
 Usage:
 python google_workspace_assessment.py 
@@ -28,16 +28,124 @@ import csv
 import json
 import argparse
 import time
+import random
+import string
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import Dict, Any, List, Tuple
 
-import pandas as pd
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 from googleapiclient.errors import HttpError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Largest page sizes accepted by the Directory API list methods
+GROUPS_PAGE_SIZE = 200
+MEMBERS_PAGE_SIZE = 200
+RESOURCES_PAGE_SIZE = 500
+
+# Partial-response projections of the list calls
+_GROUP_FIELDS = 'id,email,name,description,adminCreated,directMembersCount,memberCount'
+_GROUPS_FIELDS = f'groups({_GROUP_FIELDS}),nextPageToken'
+_GROUP_IDS_FIELDS = 'groups(id),nextPageToken'
+_MEMBERS_FIELDS = 'members(id,email,role,type,status),nextPageToken'
+_BUILDINGS_FIELDS = 'buildings(buildingId,buildingName,description,floorNames),nextPageToken'
+_CAL_RES_FIELDS = ('items(resourceId,resourceName,resourceEmail,resourceType,buildingId,floorName,'
+                   'capacity,featureInstances),nextPageToken')
+
+# Group email prefixes listed concurrently with --shard-groups
+GROUP_SHARD_PREFIXES = string.ascii_lowercase + string.digits
+GROUP_SHARD_WORKERS = 8
+
+# members().list requests sent per batch HTTP round trip
+MEMBERS_BATCH_SIZE = 100
+
+# Times one throttled members page is retried before giving up
+MAX_THROTTLE_RETRIES = 5
+
+# HTTP statuses retried with exponential backoff
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 6
+
+def _retry_delay(resp, attempt):
+    """Seconds to wait before retrying, preferring the server's Retry-After header."""
+    try:
+        delay = float(resp.get('retry-after', 0))
+    except (TypeError, ValueError):
+        delay = 0
+    return delay or min(60, 2 ** attempt) + random.random()
+
+def _is_retryable(exception):
+    """Whether an API error is throttling or a transient server error worth retrying."""
+    if not isinstance(exception, HttpError):
+        return False
+    if exception.resp.status in RETRYABLE_STATUSES:
+        return True
+    # The Admin SDK reports exceeded rate limits as 403 rateLimitExceeded/userRateLimitExceeded
+    return exception.resp.status == 403 and b'ratelimitexceeded' in (exception.content or b'').lower()
+
+def execute_with_backoff(request):
+    """
+    Execute an API or batch request, retrying with exponential backoff on
+    throttling and transient server errors.
+    
+    Args:
+        request: googleapiclient HttpRequest or BatchHttpRequest to execute
+        
+    Returns:
+        The API response
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if not _is_retryable(e) or attempt == MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(e.resp, attempt))
+
+
+# CSV columns of each export
+GROUP_FIELDS = ['Group ID', 'Group Email', 'Group Name', 'Description', 'Admin Created',
+                'Direct Members Count', 'Member Count']
+BUILDING_FIELDS = ['kind', 'etags', 'buildingId', 'buildingName', 'description', 'floorNames']
+ROOM_FIELDS = ['Resource ID', 'Resource Name', 'Email', 'Building ID', 'Floor Name', 'Capacity',
+               'Resource Type', 'Features']
+MEMBERSHIP_FIELDS = ['Group ID', 'Group Email', 'Group Name', 'Member ID', 'Member Email',
+                     'Member Role', 'Member Type', 'Member Status']
+EQUIPMENT_FIELDS = ['Resource ID', 'Resource Name', 'Email', 'Resource Type', 'Features']
+
+# Calendar resource types exported as rooms; everything else is equipment
+ROOM_TYPES = ('Conference Room', 'Meeting Space', 'Room')
+
+# Member fields written after the group columns of a membership row
+_MEMBER_DEFAULTS = {'id': '', 'email': '', 'role': '', 'type': '', 'status': ''}
+_member_columns = itemgetter('id', 'email', 'role', 'type', 'status')
+
+def write_json(path, data):
+    """Write data to a JSON file indented by 2 spaces, using orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+def _return_df(csv_path):
+    """Load an exported CSV into a pandas DataFrame (an empty one if there is no file)."""
+    import pandas as pd
+    if not csv_path:
+        return pd.DataFrame()
+    return pd.read_csv(csv_path)
+
 class GoogleWorkspaceExporter:
     def __init__(self, domain: str, service_account_file: str, 
-                 admin_email: str, output_dir: str = 'workspace_exports'):
+                 admin_email: str, output_dir: str = 'workspace_exports',
+                 shard_groups: bool = False):
         """
         Initialize Google Workspace Exporter.
         
@@ -46,6 +154,7 @@ class GoogleWorkspaceExporter:
             service_account_file: Service account credentials file path
             admin_email: Admin email for domain-wide delegation
             output_dir: Directory to save exported data
+            shard_groups: List groups concurrently, sharded by email prefix
         """
         self.domain = domain
         self.service_account_file = service_account_file
@@ -54,6 +163,9 @@ class GoogleWorkspaceExporter:
         self.raw_data_dir = os.path.join(output_dir, "raw_data")
         self.creds = None
         self.services = {}
+        self._calendar_resources = None
+        self.shard_groups = shard_groups
+        self._local = threading.local()
         
         # Create output directories
         os.makedirs(output_dir, exist_ok=True)
@@ -69,7 +181,6 @@ class GoogleWorkspaceExporter:
                 'https://www.googleapis.com/auth/admin.directory.group.member.readonly',
                 'https://www.googleapis.com/auth/admin.directory.resource.calendar.readonly',
                 'https://www.googleapis.com/auth/admin.directory.resource.calendar',
-                'https://www.googleapis.com/auth/admin.directory.resource.calendar',
                 'https://www.googleapis.com/auth/admin.directory.orgunit.readonly',
                 'https://www.googleapis.com/auth/admin.directory.domain.readonly',
             ]
@@ -85,342 +196,450 @@ class GoogleWorkspaceExporter:
     def initialize_services(self):
         """Initialize Google Workspace API services."""
         try:
-            self.services['directory'] = build('admin', 'directory_v1', credentials=self.creds)
-            self.services['groupssettings'] = build('groupssettings', 'v1', credentials=self.creds)
+            # Use the discovery documents bundled with the client library
+            self.services['directory'] = build('admin', 'directory_v1', credentials=self.creds,
+                                               static_discovery=True, cache_discovery=False)
+            self.services['groupssettings'] = build('groupssettings', 'v1', credentials=self.creds,
+                                                    static_discovery=True, cache_discovery=False)
             print("Services initialized successfully")
         except Exception as e:
             print(f"Error initializing services: {e}")
             raise
 
+    def _thread_directory_service(self):
+        """
+        Get a Directory API service owned by the calling thread.
+        
+        The underlying httplib2 transport is not thread-safe, so every worker
+        thread builds its own service on first use.
+        """
+        service = getattr(self._local, 'directory', None)
+        if service is None:
+            service = build('admin', 'directory_v1', credentials=self.creds,
+                            static_discovery=True, cache_discovery=False)
+            self._local.directory = service
+        return service
+
+    def _iter_group_pages(self, service, query=None, fields=_GROUPS_FIELDS):
+        """
+        Yield the groups of the domain one API page at a time.
+        
+        Args:
+            service: Directory API service to use
+            query: Optional groups search query
+            fields: Partial-response projection of each page
+        """
+        page_token = None
+        
+        while True:
+            results = execute_with_backoff(service.groups().list(
+                domain=self.domain,
+                maxResults=GROUPS_PAGE_SIZE,
+                pageToken=page_token,
+                query=query,
+                fields=fields
+            ))
+            
+            current_groups = results.get('groups', [])
+            if not current_groups:
+                break
+            
+            yield current_groups
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+    def _iter_sharded_group_pages(self):
+        """
+        Yield the groups of the domain, listing each email prefix in its own thread.
+        
+        Every shard is paginated serially, so the page token chain of one
+        shard does not hold up the others. Shards are yielded in prefix order
+        and groups already returned by an earlier shard are dropped.
+        
+        Groups whose email starts with a character outside
+        GROUP_SHARD_PREFIXES match no shard, so the IDs of all groups are
+        then listed without sharding and any group the shards missed is
+        fetched on its own.
+        """
+        def fetch_shard(prefix):
+            service = self._thread_directory_service()
+            return [group for page in self._iter_group_pages(service, query=f"email:{prefix}*")
+                    for group in page]
+        
+        seen_ids = set()
+        with ThreadPoolExecutor(max_workers=GROUP_SHARD_WORKERS) as executor:
+            for shard in executor.map(fetch_shard, GROUP_SHARD_PREFIXES):
+                groups = [group for group in shard if group.get('id') not in seen_ids]
+                seen_ids.update(group.get('id') for group in groups)
+                if groups:
+                    yield groups
+        
+        # Cross-check the shards against a listing of just the group IDs
+        service = self.services['directory']
+        missing = [group['id'] for page in self._iter_group_pages(service, fields=_GROUP_IDS_FIELDS)
+                   for group in page if group.get('id') not in seen_ids]
+        if missing:
+            print(f"Fetching {len(missing)} groups not covered by the email prefix shards")
+            yield [execute_with_backoff(service.groups().get(groupKey=group_id, fields=_GROUP_FIELDS))
+                   for group_id in missing]
+
     def export_groups(self):
         """
         Export all groups in the domain to a CSV file.
         
+        Rows are written to the CSV one page at a time as they are retrieved.
+        
         Returns:
-            Tuple containing DataFrame with groups data and path to the CSV file
+            Tuple containing the number of groups exported and path to the CSV file
         """
         print("\nExporting groups...")
         groups = []
-        page_token = None
+        csv_path = os.path.join(self.output_dir, 'groups_export.csv')
+        
+        if self.shard_groups:
+            pages = self._iter_sharded_group_pages()
+        else:
+            pages = self._iter_group_pages(self.services['directory'])
         
         try:
-            while True:
-                results = self.services['directory'].groups().list(
-                    domain=self.domain,
-                    maxResults=200,
-                    pageToken=page_token,
-                    fields='groups(id,email,name,description,adminCreated,directMembersCount,memberCount),nextPageToken'
-                ).execute()
-                
-                current_groups = results.get('groups', [])
-                if not current_groups:
-                    break
-                
-                groups.extend(current_groups)
-                print(f"Retrieved {len(groups)} groups so far...")
-                
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
+            with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=GROUP_FIELDS)
+                writer.writeheader()
                 
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
+                for current_groups in pages:
+                    groups.extend(current_groups)
+                    
+                    # Write the page to the CSV
+                    for group in current_groups:
+                        writer.writerow({
+                            'Group ID': group.get('id', ''),
+                            'Group Email': group.get('email', ''),
+                            'Group Name': group.get('name', ''),
+                            'Description': group.get('description', ''),
+                            'Admin Created': group.get('adminCreated', False),
+                            'Direct Members Count': group.get('directMembersCount', 0),
+                            'Member Count': group.get('memberCount', 0),
+                        })
+                    print(f"Retrieved {len(groups)} groups so far...")
             
             # Save the raw data
-            with open(os.path.join(self.raw_data_dir, 'groups_raw.json'), 'w') as f:
-                json.dump(groups, f, indent=2)
+            write_json(os.path.join(self.raw_data_dir, 'groups_raw.json'), groups)
             
-            # Prepare data for CSV export
-            groups_data = []
-            for group in groups:
-                group_data = {
-                    'Group ID': group.get('id', ''),
-                    'Group Email': group.get('email', ''),
-                    'Group Name': group.get('name', ''),
-                    'Description': group.get('description', ''),
-                    'Admin Created': group.get('adminCreated', False),
-                    'Direct Members Count': group.get('directMembersCount', 0),
-                    'Member Count': group.get('memberCount', 0),
-                }
-                groups_data.append(group_data)
+            print(f"Exported {len(groups)} groups to {csv_path}")
             
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(groups_data)
-            csv_path = os.path.join(self.output_dir, 'groups_export.csv')
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Exported {len(groups_data)} groups to {csv_path}")
-            
-            return df, csv_path
+            return len(groups), csv_path
             
         except Exception as e:
             print(f"Error exporting groups: {e}")
-            return pd.DataFrame(), ""
+            return 0, ""
 
-    def export_group_memberships(self, groups_df=None):
+    def export_group_memberships(self, groups_csv_path=None, return_df=False):
         """
         Export all group memberships in the domain to a CSV file.
         
+        Memberships are written to the CSV as each batch response arrives,
+        so only a running count is kept in memory.
+        
         Args:
-            groups_df: Optional DataFrame with groups data from export_groups().
-                       If not provided, will fetch groups first.
+            groups_csv_path: Optional path of the groups CSV written by export_groups().
+                             If not provided, will fetch groups first.
+            return_df: Return a DataFrame read back from the CSV instead of the count
         
         Returns:
-            Tuple containing DataFrame with memberships data and path to the CSV file
+            Tuple containing the number of memberships exported (or a DataFrame
+            with them when return_df is set) and path to the CSV file
         """
         print("\nExporting group memberships...")
         
-        # If groups_df not provided, fetch groups first
-        if groups_df is None or groups_df.empty:
-            groups_df, _ = self.export_groups()
+        # If the groups CSV is not provided, fetch groups first
+        if not groups_csv_path:
+            _, groups_csv_path = self.export_groups()
         
-        if groups_df.empty:
+        if not groups_csv_path:
             print("No groups available to export memberships for.")
-            return pd.DataFrame(), ""
+            return (_return_df(None) if return_df else 0), ""
         
-        # Get all group emails
-        all_memberships = []
+        
+        # Pages of members still to fetch: (id, email, name, page token, retries)
+        # Only the four needed columns are read, without building a dict per row
+        with open(groups_csv_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, GROUP_FIELDS)
+            group_columns = itemgetter(*(header.index(name) for name in
+                                         ('Group ID', 'Group Email', 'Group Name', 'Member Count')))
+            pending = [
+                (group_id, group_email, group_name, None, 0)
+                for group_id, group_email, group_name, member_count in map(group_columns, reader)
+                if member_count != '0'
+            ]
         
         # For progress tracking
-        total_groups = len(groups_df)
-        processed = 0
+        total_groups = len(pending)
+        first_round = True
+        membership_count = [0]
+        
+        csv_path = os.path.join(self.output_dir, 'group_memberships_export.csv')
+        csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+        writer = csv.writer(csv_file)
+        writer.writerow(MEMBERSHIP_FIELDS)
         
         try:
-            for _, group in groups_df.iterrows():
-                group_email = group['Group Email']
-                group_id = group['Group ID']
-                group_name = group['Group Name']
+            while pending:
+                follow_up = []
+                # (response, retries) of each throttled page; batch callbacks run
+                # on this thread, so the lists need no lock
+                throttled = []
                 
-                processed += 1
-                if processed % 10 == 0 or processed == total_groups:
-                    print(f"Processing group {processed}/{total_groups}: {group_email}")
-                
-                # Skip if no members
-                if group['Member Count'] == 0:
-                    continue
-                
-                # Get all members
-                members = []
-                page_token = None
-                
-                while True:
-                    try:
-                        results = self.services['directory'].members().list(
-                            groupKey=group_email,
-                            maxResults=200,
-                            pageToken=page_token,
-                            fields='members(id,email,role,type,status),nextPageToken'
-                        ).execute()
-                        
-                        current_members = results.get('members', [])
-                        if not current_members:
-                            break
+                for start in range(0, len(pending), MEMBERS_BATCH_SIZE):
+                    chunk = pending[start:start + MEMBERS_BATCH_SIZE]
+                    
+                    def on_members(request_id, response, exception, chunk=chunk):
+                        group_id, group_email, group_name, page_token, retries = chunk[int(request_id)]
                         
-                        members.extend(current_members)
+                        if exception is not None:
+                            status = exception.resp.status if isinstance(exception, HttpError) else None
+                            if status == 404:
+                                print(f"Group not found: {group_email}")
+                            elif _is_retryable(exception) and retries < MAX_THROTTLE_RETRIES:
+                                throttled.append((exception.resp, retries))
+                                follow_up.append((group_id, group_email, group_name, page_token, retries + 1))
+                            else:
+                                print(f"Error fetching members for group {group_email}: {exception}")
+                            return
                         
-                        page_token = results.get('nextPageToken')
-                        if not page_token:
-                            break
+                        # Write each member to the CSV
+                        members = response.get('members', [])
+                        group_columns = (group_id, group_email, group_name)
+                        writer.writerows(group_columns + _member_columns({**_MEMBER_DEFAULTS, **member})
+                                         for member in members)
+                        membership_count[0] += len(members)
                         
-                    except HttpError as e:
-                        if e.resp.status == 404:
-                            print(f"Group not found: {group_email}")
-                            break
-                        else:
-                            print(f"Error fetching members for group {group_email}: {e}")
-                            break
+                        # Queue the next page of large groups for a follow-up batch
+                        page_token = response.get('nextPageToken')
+                        if page_token:
+                            follow_up.append((group_id, group_email, group_name, page_token, 0))
+                    
+                    batch = self.services['directory'].new_batch_http_request(callback=on_members)
+                    for i, (group_id, group_email, group_name, page_token, _) in enumerate(chunk):
+                        batch.add(
+                            self.services['directory'].members().list(
+                                groupKey=group_email,
+                                maxResults=MEMBERS_PAGE_SIZE,
+                                pageToken=page_token,
+                                fields=_MEMBERS_FIELDS
+                            ),
+                            request_id=str(i)
+                        )
+                    execute_with_backoff(batch)
+                    
+                    if first_round:
+                        print(f"Processed {min(start + MEMBERS_BATCH_SIZE, total_groups)}/{total_groups} groups")
                 
-                # Add each member to the all_memberships list
-                for member in members:
-                    membership = {
-                        'Group ID': group_id,
-                        'Group Email': group_email,
-                        'Group Name': group_name,
-                        'Member ID': member.get('id', ''),
-                        'Member Email': member.get('email', ''),
-                        'Member Role': member.get('role', ''),
-                        'Member Type': member.get('type', ''),
-                        'Member Status': member.get('status', '')
-                    }
-                    all_memberships.append(membership)
+                # Back off only when the API reported throttling or a transient error
+                if throttled:
+                    resp, retries = max(throttled, key=itemgetter(1))
+                    time.sleep(_retry_delay(resp, retries))
                 
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
+                pending = follow_up
+                first_round = False
             
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(all_memberships)
-            csv_path = os.path.join(self.output_dir, 'group_memberships_export.csv')
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Exported {len(all_memberships)} group memberships to {csv_path}")
+            csv_file.close()
+            print(f"Exported {membership_count[0]} group memberships to {csv_path}")
             
-            return df, csv_path
+            if return_df:
+                return _return_df(csv_path), csv_path
+            return membership_count[0], csv_path
             
         except Exception as e:
             print(f"Error exporting group memberships: {e}")
-            return pd.DataFrame(), ""
+            return (_return_df(None) if return_df else 0), ""
+        
+        finally:
+            csv_file.close()
 
     def export_buildings(self):
         """
         Export all buildings in the domain to a CSV file.
         
         Returns:
-            Tuple containing DataFrame with buildings data and path to the CSV file
+            Tuple containing the number of buildings exported and path to the CSV file
         """
         print("\nExporting buildings...")
         buildings = []
+        csv_path = os.path.join(self.output_dir, 'buildings_export.csv')
+        
+        page_token = None
         
         try:
-            results = self.services['directory'].resources().buildings().list(
-                customer='my_customer',
-                fields='buildings(buildingId,buildingName,description,floorNames)'
-            ).execute()
-            
-            buildings = results.get('buildings', [])
+            while True:
+                results = execute_with_backoff(self.services['directory'].resources().buildings().list(
+                    customer='my_customer',
+                    maxResults=RESOURCES_PAGE_SIZE,
+                    pageToken=page_token,
+                    fields=_BUILDINGS_FIELDS
+                ))
+                
+                buildings.extend(results.get('buildings', []))
+                
+                page_token = results.get('nextPageToken')
+                if not page_token:
+                    break
             
             # Save the raw data
-            with open(os.path.join(self.raw_data_dir, 'buildings_raw.json'), 'w') as f:
-                json.dump(buildings, f, indent=2)
+            write_json(os.path.join(self.raw_data_dir, 'buildings_raw.json'), buildings)
             
-            # Prepare data for CSV export
-            buildings_data = []
-            for building in buildings:
-                # Convert floorNames list to a comma-separated string
-                floor_names = ','.join(building.get('floorNames', []))
-                
-                building_data = {
-                    'kind': building.get('kind', ''),
-                    'etags': building.get('etags', ''),
-                    'buildingId': building.get('buildingId', ''),
-                    'buildingName': building.get('buildingName', ''),
-                    'description': building.get('description', ''),
-                    'floorNames': floor_names
-                }
-                buildings_data.append(building_data)
+            # Write the buildings to the CSV
+            with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=BUILDING_FIELDS)
+                writer.writeheader()
+                for building in buildings:
+                    # Convert floorNames list to a comma-separated string
+                    floor_names = ','.join(building.get('floorNames', []))
+                    
+                    writer.writerow({
+                        'kind': building.get('kind', ''),
+                        'etags': building.get('etags', ''),
+                        'buildingId': building.get('buildingId', ''),
+                        'buildingName': building.get('buildingName', ''),
+                        'description': building.get('description', ''),
+                        'floorNames': floor_names
+                    })
             
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(buildings_data)
-            csv_path = os.path.join(self.output_dir, 'buildings_export.csv')
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Exported {len(buildings_data)} buildings to {csv_path}")
+            print(f"Exported {len(buildings)} buildings to {csv_path}")
             
-            return df, csv_path
+            return len(buildings), csv_path
             
         except Exception as e:
             print(f"Error exporting buildings: {e}")
-            return pd.DataFrame(), ""
+            return 0, ""
+
+    def _fetch_calendar_resources(self):
+        """
+        Get all calendar resources in the domain, shared by the rooms and equipment exports.
+        
+        The resources are fetched once, saved to the raw data directory and
+        reused on later calls. Each resource gets a '_features_str' entry with
+        its feature names joined for the CSV exports.
+        
+        Returns:
+            List of calendar resources
+        """
+        if self._calendar_resources is not None:
+            return self._calendar_resources
+        
+        calendar_resources = []
+        page_token = None
+        
+        while True:
+            results = execute_with_backoff(self.services['directory'].resources().calendars().list(
+                customer='my_customer',
+                maxResults=RESOURCES_PAGE_SIZE,
+                pageToken=page_token,
+                fields=_CAL_RES_FIELDS
+            ))
+            
+            calendar_resources.extend(results.get('items', []))
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        
+        # Save the raw data
+        write_json(os.path.join(self.raw_data_dir, 'calendar_resources_raw.json'), calendar_resources)
+        
+        # Join the feature names once so both exports can use them directly
+        for resource in calendar_resources:
+            resource['_features_str'] = ', '.join(
+                feature['feature']['name']
+                for feature in resource.get('featureInstances', ())
+                if 'feature' in feature and 'name' in feature['feature']
+            )
+        
+        self._calendar_resources = calendar_resources
+        return calendar_resources
 
     def export_rooms(self):
         """
         Export all rooms (calendar resources) in the domain to a CSV file.
         
         Returns:
-            Tuple containing DataFrame with rooms data and path to the CSV file
+            Tuple containing the number of rooms exported and path to the CSV file
         """
         print("\nExporting rooms...")
-        rooms = []
+        csv_path = os.path.join(self.output_dir, 'rooms_export.csv')
         
         try:
             # Get all calendar resources
-            results = self.services['directory'].resources().calendars().list(
-                customer='my_customer',
-                fields='items(resourceId,resourceName,resourceEmail,resourceType,buildingId,floorName,capacity,featureInstances)'
-            ).execute()
+            calendar_resources = self._fetch_calendar_resources()
             
-            calendar_resources = results.get('items', [])
+            # Filter for rooms and write them to the CSV
+            room_count = 0
+            with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=ROOM_FIELDS)
+                writer.writeheader()
+                for resource in calendar_resources:
+                    # Only include rooms (not equipment)
+                    if resource.get('resourceType') in ROOM_TYPES:
+                        writer.writerow({
+                            'Resource ID': resource.get('resourceId', ''),
+                            'Resource Name': resource.get('resourceName', ''),
+                            'Email': resource.get('resourceEmail', ''),
+                            'Building ID': resource.get('buildingId', ''),
+                            'Floor Name': resource.get('floorName', ''),
+                            'Capacity': resource.get('capacity', ''),
+                            'Resource Type': resource.get('resourceType', ''),
+                            'Features': resource['_features_str']
+                        })
+                        room_count += 1
             
-            # Save the raw data
-            with open(os.path.join(self.raw_data_dir, 'calendar_resources_raw.json'), 'w') as f:
-                json.dump(calendar_resources, f, indent=2)
+            print(f"Exported {room_count} rooms to {csv_path}")
             
-            # Filter for rooms and prepare data for CSV export
-            rooms_data = []
-            for resource in calendar_resources:
-                # Only include rooms (not equipment)
-                if resource.get('resourceType') in ['Conference Room', 'Meeting Space', 'Room']:
-                    # Extract features
-                    features = []
-                    if 'featureInstances' in resource:
-                        for feature in resource.get('featureInstances', []):
-                            if 'feature' in feature and 'name' in feature['feature']:
-                                features.append(feature['feature']['name'])
-                    
-                    features_str = ', '.join(features)
-                    
-                    room_data = {
-                        'Resource ID': resource.get('resourceId', ''),
-                        'Resource Name': resource.get('resourceName', ''),
-                        'Email': resource.get('resourceEmail', ''),
-                        'Building ID': resource.get('buildingId', ''),
-                        'Floor Name': resource.get('floorName', ''),
-                        'Capacity': resource.get('capacity', ''),
-                        'Resource Type': resource.get('resourceType', ''),
-                        'Features': features_str
-                    }
-                    rooms_data.append(room_data)
-            
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(rooms_data)
-            csv_path = os.path.join(self.output_dir, 'rooms_export.csv')
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Exported {len(rooms_data)} rooms to {csv_path}")
-            
-            return df, csv_path
+            return room_count, csv_path
             
         except Exception as e:
             print(f"Error exporting rooms: {e}")
-            return pd.DataFrame(), ""
+            return 0, ""
 
     def export_equipment(self):
         """
         Export all equipment (calendar resources) in the domain to a CSV file.
         
         Returns:
-            Tuple containing DataFrame with equipment data and path to the CSV file
+            Tuple containing the number of equipment items exported and path to the CSV file
         """
         print("\nExporting equipment...")
+        csv_path = os.path.join(self.output_dir, 'equipment_export.csv')
         
         try:
             # Get all calendar resources
-            results = self.services['directory'].resources().calendars().list(
-                customer='my_customer',
-                fields='items(resourceId,resourceName,resourceEmail,resourceType,featureInstances)'
-            ).execute()
+            calendar_resources = self._fetch_calendar_resources()
             
-            calendar_resources = results.get('items', [])
-            
-            # Filter for equipment and prepare data for CSV export
-            equipment_data = []
-            for resource in calendar_resources:
-                # Only include equipment (not rooms)
-                if resource.get('resourceType') not in ['Conference Room', 'Meeting Space', 'Room']:
-                    # Extract features
-                    features = []
-                    if 'featureInstances' in resource:
-                        for feature in resource.get('featureInstances', []):
-                            if 'feature' in feature and 'name' in feature['feature']:
-                                features.append(feature['feature']['name'])
-                    
-                    features_str = ', '.join(features)
-                    
-                    equipment_item = {
-                        'Resource ID': resource.get('resourceId', ''),
-                        'Resource Name': resource.get('resourceName', ''),
-                        'Email': resource.get('resourceEmail', ''),
-                        'Resource Type': resource.get('resourceType', ''),
-                        'Features': features_str
-                    }
-                    equipment_data.append(equipment_item)
+            # Filter for equipment and write it to the CSV
+            equipment_count = 0
+            with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+                writer = csv.DictWriter(csv_file, fieldnames=EQUIPMENT_FIELDS)
+                writer.writeheader()
+                for resource in calendar_resources:
+                    # Only include equipment (not rooms)
+                    if resource.get('resourceType') not in ROOM_TYPES:
+                        writer.writerow({
+                            'Resource ID': resource.get('resourceId', ''),
+                            'Resource Name': resource.get('resourceName', ''),
+                            'Email': resource.get('resourceEmail', ''),
+                            'Resource Type': resource.get('resourceType', ''),
+                            'Features': resource['_features_str']
+                        })
+                        equipment_count += 1
             
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(equipment_data)
-            csv_path = os.path.join(self.output_dir, 'equipment_export.csv')
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Exported {len(equipment_data)} equipment items to {csv_path}")
+            print(f"Exported {equipment_count} equipment items to {csv_path}")
             
-            return df, csv_path
+            return equipment_count, csv_path
             
         except Exception as e:
             print(f"Error exporting equipment: {e}")
-            return pd.DataFrame(), ""
+            return 0, ""
 
     def run_all_exports(self):
         """Run all export functions and return a summary of results."""
@@ -429,24 +648,24 @@ class GoogleWorkspaceExporter:
         results = {}
         
         # Export groups
-        groups_df, groups_path = self.export_groups()
-        results['Groups'] = {'count': len(groups_df), 'path': groups_path}
+        groups_count, groups_path = self.export_groups()
+        results['Groups'] = {'count': groups_count, 'path': groups_path}
         
         # Export group memberships
-        memberships_df, memberships_path = self.export_group_memberships(groups_df)
-        results['Group Memberships'] = {'count': len(memberships_df), 'path': memberships_path}
+        memberships_count, memberships_path = self.export_group_memberships(groups_path)
+        results['Group Memberships'] = {'count': memberships_count, 'path': memberships_path}
         
         # Export buildings
-        buildings_df, buildings_path = self.export_buildings()
-        results['Buildings'] = {'count': len(buildings_df), 'path': buildings_path}
+        buildings_count, buildings_path = self.export_buildings()
+        results['Buildings'] = {'count': buildings_count, 'path': buildings_path}
         
         # Export rooms
-        rooms_df, rooms_path = self.export_rooms()
-        results['Rooms'] = {'count': len(rooms_df), 'path': rooms_path}
+        rooms_count, rooms_path = self.export_rooms()
+        results['Rooms'] = {'count': rooms_count, 'path': rooms_path}
         
         # Export equipment
-        equipment_df, equipment_path = self.export_equipment()
-        results['Equipment'] = {'count': len(equipment_df), 'path': equipment_path}
+        equipment_count, equipment_path = self.export_equipment()
+        results['Equipment'] = {'count': equipment_count, 'path': equipment_path}
         
         return results
 
@@ -457,6 +676,9 @@ def main():
     parser.add_argument('--service-account', required=True, help='Path to service account JSON file')
     parser.add_argument('--admin-email', required=True, help='Admin email for domain-wide delegation')
     parser.add_argument('--output-dir', default='workspace_exports', help='Directory to save exported data')
+    parser.add_argument('--shard-groups', action='store_true',
+                        help='List groups concurrently by email prefix (faster on large domains; '
+                             'groups whose email starts with another character are skipped)')
     
     args = parser.parse_args()
     
@@ -466,7 +688,8 @@ def main():
             domain=args.domain,
             service_account_file=args.service_account,
             admin_email=args.admin_email,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            shard_groups=args.shard_groups
         )
         
         # Authenticate and initialize services
@@ -11,16 +11,129 @@ python add_admin_to_shared_drives.py
     --admin-email admin@yourdomain.com
     [--role manager]
     [--dry-run]
+    [--max-workers 10]
 """
 
 import os
 import json
 import argparse
 import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 from googleapiclient.errors import HttpError
 
+# Shared Drives processed concurrently
+DEFAULT_MAX_WORKERS = 10
+
+# Drives started per second, kept below the Drive API per-user quota
+DEFAULT_DRIVES_PER_SECOND = 5
+
+_local = threading.local()
+
+# Largest page size accepted by drives().list and permissions().list
+PAGE_SIZE = 100
+
+# permissions().create requests sent per batch HTTP round trip
+BATCH_SIZE = 100
+
+# HTTP statuses retried with exponential backoff
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 6
+
+def _retry_delay(resp, attempt):
+    """Seconds to wait before retrying, preferring the server's Retry-After header."""
+    try:
+        delay = float(resp.get('retry-after', 0))
+    except (TypeError, ValueError):
+        delay = 0
+    return delay or min(60, 2 ** attempt) + random.random()
+
+def _is_retryable(exception):
+    """Whether an API error is throttling or a transient server error worth retrying."""
+    if not isinstance(exception, HttpError):
+        return False
+    if exception.resp.status in RETRYABLE_STATUSES:
+        return True
+    # Drive reports exceeded rate limits as 403 rateLimitExceeded/userRateLimitExceeded
+    return exception.resp.status == 403 and b'ratelimitexceeded' in (exception.content or b'').lower()
+
+def execute_with_backoff(request):
+    """
+    Execute an API or batch request, retrying with exponential backoff on
+    throttling and transient server errors.
+    
+    Args:
+        request: googleapiclient HttpRequest or BatchHttpRequest to execute
+        
+    Returns:
+        The API response
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if not _is_retryable(e) or attempt == MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(e.resp, attempt))
+
+class RateLimiter:
+    """Thread-safe token bucket that limits how often API calls can start.
+    
+    The bucket holds at least one token, so a rate below one per second
+    still lets a call through every 1/rate seconds.
+    """
+    
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def positive_rate(value: str) -> float:
+    """argparse type for a per-second rate, which must be greater than zero."""
+    rate = float(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than zero, got {value}")
+    return rate
+
+def get_thread_drive_service(creds):
+    """
+    Get a Drive API service owned by the calling thread.
+    
+    The underlying httplib2 transport is not thread-safe, so every worker
+    thread builds its own service on first use.
+    
+    Args:
+        creds: Delegated service account credentials
+        
+    Returns:
+        Drive API service for the current thread
+    """
+    service = getattr(_local, 'drive_service', None)
+    if service is None:
+        service = build('drive', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
+        _local.drive_service = service
+    return service
+
 def get_all_shared_drives(drive_service):
     """
     Retrieves all Shared Drives in the organization.
@@ -37,11 +150,11 @@ def get_all_shared_drives(drive_service):
     
     while True:
         try:
-            results = drive_service.drives().list(
-                pageSize=100,
+            results = execute_with_backoff(drive_service.drives().list(
+                pageSize=PAGE_SIZE,
                 pageToken=page_token,
-                fields="nextPageToken, drives(id, name, createdTime, hidden)"
-            ).execute()
+                fields="nextPageToken, drives(id, name)"
+            ))
             
             current_drives = results.get('drives', [])
             if not current_drives:
@@ -53,9 +166,6 @@ def get_all_shared_drives(drive_service):
             page_token = results.get('nextPageToken')
             if not page_token:
                 break
-            
-            # Small delay to avoid rate limiting
-            time.sleep(0.5)
         
         except HttpError as e:
             print(f"Error retrieving Shared Drives: {e}")
@@ -75,20 +185,28 @@ def check_admin_permissions(drive_service, drive_id, admin_email):
     Returns:
         Tuple of (has_permissions, permission_id, current_role)
     """
+    admin_email = admin_email.lower()
+    page_token = None
+    
     try:
-        # List permissions for the drive
-        permissions = drive_service.permissions().list(
-            fileId=drive_id,
-            supportsAllDrives=True,
-            fields="permissions(id, emailAddress, role)"
-        ).execute()
-        
-        # Check if admin already has permissions
-        for permission in permissions.get('permissions', []):
-            if permission.get('emailAddress', '').lower() == admin_email.lower():
-                return True, permission.get('id'), permission.get('role')
-        
-        return False, None, None
+        while True:
+            # List permissions for the drive
+            permissions = execute_with_backoff(drive_service.permissions().list(
+                fileId=drive_id,
+                supportsAllDrives=True,
+                pageSize=PAGE_SIZE,
+                pageToken=page_token,
+                fields="nextPageToken, permissions(id, emailAddress, role)"
+            ))
+            
+            # Check if admin already has permissions, stopping at the first match
+            for permission in permissions.get('permissions', []):
+                if permission.get('emailAddress', '').lower() == admin_email:
+                    return True, permission.get('id'), permission.get('role')
+            
+            page_token = permissions.get('nextPageToken')
+            if not page_token:
+                return False, None, None
     
     except HttpError as e:
         print(f"Error checking permissions for drive {drive_id}: {e}")
@@ -98,6 +216,12 @@ def add_admin_to_drive(drive_service, drive_id, drive_name, admin_email, role, d
     """
     Adds the admin to a Shared Drive with the specified role.
     
+    The permission is created directly, which is all that is needed on a
+    first rollout. Only when the API reports that the admin already has a
+    permission are the drive's permissions listed and the role updated.
+    A dry run checks the existing permissions first, so the preview shows
+    what a real run would do.
+    
     Args:
         drive_service: Authenticated Drive API service
         drive_id: ID of the Shared Drive
@@ -109,56 +233,157 @@ def add_admin_to_drive(drive_service, drive_id, drive_name, admin_email, role, d
     Returns:
         True if successful, False otherwise
     """
-    # Check if admin already has permissions
+    if dry_run:
+        has_permissions, _, current_role = check_admin_permissions(drive_service, drive_id, admin_email)
+        if not has_permissions:
+            print(f"DRY RUN: Would add {admin_email} as {role} to drive '{drive_name}'")
+        elif current_role == role:
+            print(f"Admin {admin_email} already has {role} role on drive '{drive_name}'")
+        else:
+            print(f"DRY RUN: Would update {admin_email} from {current_role} to {role} on drive '{drive_name}'")
+        return True
+    
+    try:
+        # Add the admin with the specified role
+        permission = {
+            'type': 'user',
+            'role': role,
+            'emailAddress': admin_email
+        }
+        
+        execute_with_backoff(drive_service.permissions().create(
+            fileId=drive_id,
+            supportsAllDrives=True,
+            body=permission
+        ))
+        
+        print(f"Added {admin_email} as {role} to drive '{drive_name}'")
+        return True
+    except HttpError as e:
+        if e.resp.status not in (400, 409):
+            print(f"Error adding permission to drive '{drive_name}': {e}")
+            return False
+        create_error = e
+    
+    return update_admin_on_drive(drive_service, drive_id, drive_name, admin_email, role, create_error)
+
+def update_admin_on_drive(drive_service, drive_id, drive_name, admin_email, role, create_error):
+    """
+    Gives the admin the specified role on a Shared Drive after a rejected create.
+    
+    Args:
+        drive_service: Authenticated Drive API service
+        drive_id: ID of the Shared Drive
+        drive_name: Name of the Shared Drive (for logging)
+        admin_email: Email address of the admin
+        role: Role to assign to the admin
+        create_error: HttpError returned by the rejected permissions().create
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    # The create was rejected, most likely because the admin is already a member
     has_permissions, permission_id, current_role = check_admin_permissions(
         drive_service, drive_id, admin_email)
     
-    if has_permissions:
-        if current_role == role:
-            print(f"Admin {admin_email} already has {role} role on drive '{drive_name}'")
-            return True
-        else:
-            if dry_run:
-                print(f"DRY RUN: Would update {admin_email} from {current_role} to {role} on drive '{drive_name}'")
-                return True
-                
-            try:
-                # Update the permission to the desired role
-                drive_service.permissions().update(
-                    fileId=drive_id,
-                    permissionId=permission_id,
-                    supportsAllDrives=True,
-                    body={'role': role}
-                ).execute()
-                print(f"Updated {admin_email} from {current_role} to {role} on drive '{drive_name}'")
-                return True
-            except HttpError as e:
-                print(f"Error updating permission on drive '{drive_name}': {e}")
-                return False
-    else:
-        if dry_run:
-            print(f"DRY RUN: Would add {admin_email} as {role} to drive '{drive_name}'")
-            return True
-            
-        try:
-            # Add the admin with the specified role
-            permission = {
-                'type': 'user',
-                'role': role,
-                'emailAddress': admin_email
-            }
+    if not has_permissions:
+        print(f"Error adding permission to drive '{drive_name}': {create_error}")
+        return False
+    
+    if current_role == role:
+        print(f"Admin {admin_email} already has {role} role on drive '{drive_name}'")
+        return True
+    
+    try:
+        # Update the permission to the desired role
+        execute_with_backoff(drive_service.permissions().update(
+            fileId=drive_id,
+            permissionId=permission_id,
+            supportsAllDrives=True,
+            body={'role': role}
+        ))
+        print(f"Updated {admin_email} from {current_role} to {role} on drive '{drive_name}'")
+        return True
+    except HttpError as e:
+        print(f"Error updating permission on drive '{drive_name}': {e}")
+        return False
+
+def batch_create_admin_permissions(drive_service, shared_drives, admin_email, role, limiter):
+    """
+    Adds the admin to many Shared Drives using batch HTTP requests.
+    
+    Up to BATCH_SIZE permissions().create calls are sent per HTTP round trip.
+    Throttled batches and requests are retried with exponential backoff.
+    
+    Args:
+        drive_service: Authenticated Drive API service
+        shared_drives: Shared Drives to add the admin to
+        admin_email: Email address of the admin
+        role: Role to assign to the admin
+        limiter: RateLimiter pacing the individual requests
+        
+    Returns:
+        Tuple of (success_count, failure_count, conflicts), where conflicts is
+        a list of (drive, error) for drives that rejected the create, usually
+        because the admin already has a permission on them
+    """
+    permission = {
+        'type': 'user',
+        'role': role,
+        'emailAddress': admin_email
+    }
+    counts = {'success': 0, 'failure': 0}
+    conflicts = []
+    pending = list(shared_drives)
+    attempt = 0
+    
+    while pending:
+        retry = []
+        throttled = []
+        
+        for start in range(0, len(pending), BATCH_SIZE):
+            chunk = pending[start:start + BATCH_SIZE]
             
-            drive_service.permissions().create(
-                fileId=drive_id,
-                supportsAllDrives=True,
-                body=permission
-            ).execute()
+            def on_create(request_id, response, exception, chunk=chunk):
+                drive = chunk[int(request_id)]
+                drive_name = drive.get('name', 'Unnamed Drive')
+                
+                if exception is None:
+                    print(f"Added {admin_email} as {role} to drive '{drive_name}'")
+                    counts['success'] += 1
+                    return
+                
+                status = exception.resp.status if isinstance(exception, HttpError) else None
+                if status in (400, 409):
+                    conflicts.append((drive, exception))
+                elif _is_retryable(exception) and attempt < MAX_RETRIES:
+                    retry.append(drive)
+                    throttled.append(exception.resp)
+                else:
+                    print(f"Error adding permission to drive '{drive_name}': {exception}")
+                    counts['failure'] += 1
             
-            print(f"Added {admin_email} as {role} to drive '{drive_name}'")
-            return True
-        except HttpError as e:
-            print(f"Error adding permission to drive '{drive_name}': {e}")
-            return False
+            batch = drive_service.new_batch_http_request(callback=on_create)
+            for i, drive in enumerate(chunk):
+                limiter.acquire()
+                batch.add(
+                    drive_service.permissions().create(
+                        fileId=drive.get('id'),
+                        supportsAllDrives=True,
+                        body=permission
+                    ),
+                    request_id=str(i)
+                )
+            execute_with_backoff(batch)
+        
+        if retry:
+            delay = _retry_delay(throttled[-1], attempt)
+            print(f"Retrying {len(retry)} throttled drives in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+        pending = retry
+    
+    return counts['success'], counts['failure'], conflicts
 
 def main():
     parser = argparse.ArgumentParser(description='Add Admin to All Shared Drives')
@@ -167,6 +392,10 @@ def main():
     parser.add_argument('--role', default='manager', choices=['manager', 'organizer', 'fileOrganizer', 'writer', 'commenter', 'reader'],
                         help='Role to assign to the admin (default: manager)')
     parser.add_argument('--dry-run', action='store_true', help='Simulate the operation without making changes')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f'Number of existing permissions checked concurrently (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--drives-per-second', type=positive_rate, default=DEFAULT_DRIVES_PER_SECOND,
+                        help=f'Maximum number of Shared Drives updated per second (default: {DEFAULT_DRIVES_PER_SECOND})')
     
     args = parser.parse_args()
     
@@ -189,7 +418,7 @@ def main():
         creds = creds.with_subject(args.admin_email)
         
         # Build the Drive API service
-        drive_service = build('drive', 'v3', credentials=creds)
+        drive_service = build('drive', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
         
         # Get all Shared Drives
         shared_drives = get_all_shared_drives(drive_service)
@@ -203,24 +432,41 @@ def main():
         if args.dry_run:
             print("DRY RUN MODE: No changes will be made.")
         
-        # Process each Shared Drive
-        success_count = 0
-        failure_count = 0
+        limiter = RateLimiter(args.drives_per_second)
         
-        for drive in shared_drives:
-            drive_id = drive.get('id')
-            drive_name = drive.get('name', 'Unnamed Drive')
-            
-            print(f"\nProcessing Shared Drive: '{drive_name}' (ID: {drive_id})")
+        if args.dry_run:
+            # Check the existing permissions of every drive to preview the changes
+            def preview_drive(drive):
+                limiter.acquire()
+                return add_admin_to_drive(
+                    get_thread_drive_service(creds), drive.get('id'), drive.get('name', 'Unnamed Drive'),
+                    args.admin_email, args.role, dry_run=True)
             
-            if add_admin_to_drive(
-                drive_service, drive_id, drive_name, args.admin_email, args.role, args.dry_run):
-                success_count += 1
-            else:
-                failure_count += 1
+            with ThreadPoolExecutor(max_workers=max(1, args.max_workers)) as executor:
+                previewed = list(executor.map(preview_drive, shared_drives))
+            success_count = sum(previewed)
+            failure_count = len(previewed) - success_count
+        else:
+            # Create the admin permission on every drive in batches
+            success_count, failure_count, conflicts = batch_create_admin_permissions(
+                drive_service, shared_drives, args.admin_email, args.role, limiter)
             
-            # Small delay to avoid rate limiting
-            time.sleep(0.5)
+            # Check and update the drives where the admin already has a permission
+            if conflicts:
+                print(f"\nChecking existing permissions on {len(conflicts)} Shared Drives...")
+                
+                def process_conflict(conflict):
+                    drive, create_error = conflict
+                    limiter.acquire()
+                    return update_admin_on_drive(
+                        get_thread_drive_service(creds), drive.get('id'),
+                        drive.get('name', 'Unnamed Drive'), args.admin_email, args.role, create_error)
+                
+                with ThreadPoolExecutor(max_workers=max(1, args.max_workers)) as executor:
+                    updated = list(executor.map(process_conflict, conflicts))
+                
+                success_count += sum(updated)
+                failure_count += len(updated) - sum(updated)
         
         # Print summary
         print("\n===== SUMMARY =====")
@@ -16,11 +16,265 @@ import os
 import json
 import argparse
 import time
+import random
 import datetime
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 from googleapiclient.errors import HttpError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Drive and Admin Reports scopes delegated to the service account
+SCOPES = [
+    'https://www.googleapis.com/auth/drive',
+    'https://www.googleapis.com/auth/drive.readonly',
+    'https://www.googleapis.com/auth/admin.reports.audit.readonly',
+    'https://www.googleapis.com/auth/admin.reports.usage.readonly'
+]
+# HTTP statuses retried with exponential backoff
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30
+BACKOFF_JITTER = 0.5
+# Maximum number of calls per Drive batch request
+BATCH_SIZE = 100
+# On-disk cache of drives().get results, reused for DRIVE_CACHE_TTL seconds.
+# Each admin gets its own file, since the drives an admin can see differ.
+DRIVE_CACHE_FILE = '.drive_cache_{admin}.db'
+DRIVE_CACHE_TTL = 86400
+
+def execute_with_backoff(request):
+    """
+    Execute an API request, backing off only when the server asks for it.
+    
+    Throttling (429) and server errors are retried with capped exponential
+    backoff and jitter, preferring the Retry-After header when present.
+    Other errors are raised immediately.
+    
+    Args:
+        request: googleapiclient HttpRequest to execute
+        
+    Returns:
+        The API response
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status not in RETRYABLE_STATUSES or attempt == MAX_RETRIES:
+                raise
+            try:
+                delay = float(e.resp.get('retry-after', 0))
+            except (TypeError, ValueError):
+                delay = 0
+            if not delay:
+                delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * (1 + random.random() * BACKOFF_JITTER)
+            time.sleep(delay)
+
+def write_json(path, data):
+    """Write data to a JSON file indented by 2 spaces, using orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+def make_delegated_creds(service_account_file, admin_email):
+    """
+    Create service account credentials delegated to the admin user.
+    
+    Build these once and share them between every service and worker
+    thread, since with_subject returns a new Credentials object each time.
+    
+    Args:
+        service_account_file: Path to the service account JSON key file
+        admin_email: Admin email for domain-wide delegation
+        
+    Returns:
+        Delegated Credentials with SCOPES
+    """
+    creds = service_account.Credentials.from_service_account_file(
+        service_account_file, scopes=SCOPES)
+    return creds.with_subject(admin_email)
+
+def build_service(api_name, api_version, creds):
+    """
+    Build an API service from its bundled discovery document.
+    
+    The discovery document shipped with google-api-python-client is used,
+    so no discovery request is sent and the file cache is skipped.
+    
+    Args:
+        api_name: Name of the API, e.g. 'drive'
+        api_version: Version of the API, e.g. 'v3'
+        creds: Credentials for the service
+        
+    Returns:
+        The API service
+    """
+    return build(api_name, api_version, credentials=creds, static_discovery=True,
+                 cache_discovery=False)
+
+def open_drive_cache(admin_email):
+    """
+    Open the on-disk drive metadata cache of an admin, creating it if needed.
+    
+    Args:
+        admin_email: Admin email the drives are looked up as
+        
+    Returns:
+        sqlite3 connection to the admin's DRIVE_CACHE_FILE
+    """
+    conn = sqlite3.connect(DRIVE_CACHE_FILE.format(admin=admin_email.lower()), timeout=30)
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS drives '
+        '(id TEXT PRIMARY KEY, data TEXT NOT NULL, fetched_ts INTEGER NOT NULL)'
+    )
+    return conn
+
+def batch_get_drives(drive_service, drive_ids, admin_email):
+    """
+    Resolve Shared Drive IDs using batched drives().get calls.
+    
+    Drives fetched within the last DRIVE_CACHE_TTL seconds are served from
+    the on-disk cache. Up to BATCH_SIZE lookups are sent per HTTP round trip
+    and throttled lookups are retried with exponential backoff.
+    
+    Args:
+        drive_service: Authenticated Drive API service
+        drive_ids: Iterable of Shared Drive IDs to resolve
+        admin_email: Admin email the drives are looked up as, which selects the cache file
+        
+    Returns:
+        Tuple of (drives, errors), where drives is a list of drive resources
+        and errors maps each unresolved drive ID to its exception
+    """
+    drives = []
+    errors = {}
+    pending = []
+    attempt = 0
+    
+    conn = open_drive_cache(admin_email)
+    try:
+        cutoff = int(time.time()) - DRIVE_CACHE_TTL
+        for drive_id in drive_ids:
+            row = conn.execute(
+                'SELECT data FROM drives WHERE id = ? AND fetched_ts > ?', (drive_id, cutoff)
+            ).fetchone()
+            if row:
+                drives.append(json.loads(row[0]))
+            else:
+                pending.append(drive_id)
+        cached_count = len(drives)
+        
+        while pending:
+            retry = []
+            
+            for start in range(0, len(pending), BATCH_SIZE):
+                chunk = pending[start:start + BATCH_SIZE]
+                
+                def on_get(request_id, response, exception, chunk=chunk):
+                    drive_id = chunk[int(request_id)]
+                    
+                    if exception is None:
+                        drives.append(response)
+                        return
+                    
+                    status = exception.resp.status if isinstance(exception, HttpError) else None
+                    if status in RETRYABLE_STATUSES and attempt < MAX_RETRIES:
+                        retry.append(drive_id)
+                    else:
+                        errors[drive_id] = exception
+                
+                batch = drive_service.new_batch_http_request(callback=on_get)
+                for i, drive_id in enumerate(chunk):
+                    batch.add(
+                        drive_service.drives().get(
+                            driveId=drive_id,
+                            fields="id,name,createdTime"
+                        ),
+                        request_id=str(i)
+                    )
+                execute_with_backoff(batch)
+            
+            if retry:
+                time.sleep(min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * (1 + random.random() * BACKOFF_JITTER))
+                attempt += 1
+            pending = retry
+        
+        # Remember the freshly fetched drives for later runs
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO drives (id, data, fetched_ts) VALUES (?, ?, ?)',
+                [(drive['id'], json.dumps(drive), int(time.time())) for drive in drives[cached_count:]]
+            )
+    finally:
+        conn.close()
+    
+    return drives, errors
+
+def iter_files(drive_service, query, corpora=None):
+    """
+    Yield every file matching a query across all Drives, page by page.
+    
+    Only the driveId and name of each file are requested.
+    
+    Args:
+        drive_service: Authenticated Drive API service
+        query: Drive search query
+        corpora: Optional corpora to search, e.g. 'allDrives'
+        
+    Yields:
+        File resources with driveId (when in a Shared Drive) and name
+    """
+    extra = {'corpora': corpora} if corpora else {}
+    page_token = None
+    while True:
+        response = execute_with_backoff(drive_service.files().list(
+            q=query,
+            includeItemsFromAllDrives=True,
+            supportsAllDrives=True,
+            fields="nextPageToken,files(driveId,name)",
+            pageSize=1000,
+            pageToken=page_token,
+            **extra
+        ))
+        yield from response.get('files', [])
+        
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            break
+
+def collect_drive_ids(files):
+    """
+    Collect the unique Shared Drive IDs that a stream of files lives in.
+    
+    Args:
+        files: Iterable of file resources with driveId and name
+        
+    Returns:
+        Tuple of (drive_ids, file_count), where drive_ids maps each drive ID
+        to a hint naming the first file seen in it
+    """
+    drive_ids = {}
+    file_count = 0
+    for file in files:
+        file_count += 1
+        drive_id = file.get('driveId')
+        # Build the hint only for new drives, not for every file
+        if drive_id and drive_id not in drive_ids:
+            drive_ids[drive_id] = f"from file: {file.get('name', 'Unknown file')}"
+    return drive_ids, file_count
+
 def print_section(title):
     """Print a section header for clarity."""
     print("\n" + "="*30)
@@ -30,19 +284,24 @@ def print_section(title):
 def test_api_access(service):
     """Test basic API connectivity."""
     try:
-        about = service.about().get(fields="user,kind,storageQuota").execute()
-        user_email = about.get('user', {}).get('emailAddress', 'Unknown')
-        quota = about.get('storageQuota', {})
-        quota_limit = quota.get('limit', 'Unknown')
-        quota_usage = quota.get('usage', 'Unknown')
-        
-        print(f"✅ Successfully authenticated as: {user_email}")
-        print(f"Drive storage quota: {int(quota_limit) / (1024**3):.2f} GB")
-        print(f"Drive storage usage: {int(quota_usage) / (1024**3):.2f} GB")
-        return True
+        about = execute_with_backoff(service.about().get(fields="user,storageQuota(limit,usage)"))
     except Exception as e:
         print(f"❌ Error accessing Drive API: {e}")
         return False
+    
+    user_email = about.get('user', {}).get('emailAddress', 'Unknown')
+    # Quota values are strings of bytes; limit is absent for unlimited storage
+    quota = about.get('storageQuota') or {}
+    quota_limit = int(quota.get('limit', 0))
+    quota_usage = int(quota.get('usage', 0))
+    
+    print(f"✅ Successfully authenticated as: {user_email}")
+    if quota_limit:
+        print(f"Drive storage quota: {quota_limit / (1024**3):.2f} GB")
+    else:
+        print("Drive storage quota: Unlimited")
+    print(f"Drive storage usage: {quota_usage / (1024**3):.2f} GB")
+    return True
 
 def get_shared_drives_standard(drive_service):
     """Try to retrieve Shared Drives using the standard drives().list method."""
@@ -54,11 +313,11 @@ def get_shared_drives_standard(drive_service):
         print("Attempting to list Shared Drives using drives().list API...")
         while True:
             try:
-                results = drive_service.drives().list(
+                results = execute_with_backoff(drive_service.drives().list(
                     pageSize=100,
                     pageToken=page_token,
-                    fields="nextPageToken, drives(id, name, createdTime, hidden)"
-                ).execute()
+                    fields="nextPageToken, drives(id, name, createdTime)"
+                ))
                 
                 current_drives = results.get('drives', [])
                 if current_drives:
@@ -68,9 +327,6 @@ def get_shared_drives_standard(drive_service):
                 page_token = results.get('nextPageToken')
                 if not page_token:
                     break
-                
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
             
             except HttpError as e:
                 print(f"  ❌ Error during retrieval: {e}")
@@ -78,12 +334,12 @@ def get_shared_drives_standard(drive_service):
                 
                 # Try with useDomainAdminAccess flag
                 try:
-                    results = drive_service.drives().list(
+                    results = execute_with_backoff(drive_service.drives().list(
                         pageSize=100,
                         pageToken=page_token,
                         useDomainAdminAccess=True,
                         fields="nextPageToken, drives(id, name, createdTime)"
-                    ).execute()
+                    ))
                     
                     current_drives = results.get('drives', [])
                     if current_drives:
@@ -109,233 +365,247 @@ def get_shared_drives_standard(drive_service):
         print(f"❌ Error listing Shared Drives: {e}")
         return []
 
-def get_shared_drives_using_files(drive_service):
-    """Try to find Shared Drives by looking for files in shared drives."""
+def discover_drive_ids_from_files(drive_service):
+    """
+    Try to find Shared Drive IDs by looking for files in shared drives.
+    
+    Returns:
+        Dict mapping each candidate drive ID to a hint about where it was seen
+    """
     print_section("METHOD 2: Files in Shared Drives")
     
     try:
         print("Searching for files located in Shared Drives...")
-        response = drive_service.files().list(
-            # This query includes any file in a Shared Drive
-            q="sharedWithMe=true or trashed=false",
-            includeItemsFromAllDrives=True,
-            supportsAllDrives=True,
-            fields="files(id,name,driveId,parents)",
-            pageSize=1000
-        ).execute()
-        
-        files = response.get('files', [])
-        print(f"Found {len(files)} files in total")
         
-        # Extract unique drive IDs
-        drive_ids = {}
-        for file in files:
-            if 'driveId' in file:
-                drive_id = file['driveId']
-                if drive_id not in drive_ids:
-                    drive_ids[drive_id] = file.get('name', 'Unknown file')
-        
-        print(f"Identified {len(drive_ids)} unique drive IDs from file metadata")
+        # Extract unique drive IDs; this query includes any file in a Shared Drive
+        drive_ids, file_count = collect_drive_ids(
+            iter_files(drive_service, "sharedWithMe=true or trashed=false"))
         
-        # Try to get drive information for each ID
-        shared_drives = []
-        for drive_id, sample_filename in drive_ids.items():
-            try:
-                drive = drive_service.drives().get(
-                    driveId=drive_id,
-                    fields="id,name,createdTime"
-                ).execute()
-                shared_drives.append(drive)
-                print(f"  Found Shared Drive: {drive.get('name')} (ID: {drive.get('id')})")
-            except HttpError as e:
-                print(f"  Could not retrieve drive with ID {drive_id} (from file: {sample_filename}): {e}")
+        print(f"Found {file_count} files in total")
         
-        if shared_drives:
-            print(f"✅ SUCCESS! Found {len(shared_drives)} Shared Drives through file analysis")
+        if drive_ids:
+            print(f"✅ SUCCESS! Identified {len(drive_ids)} unique drive IDs from file metadata")
         else:
-            print("❌ No Shared Drives found through file analysis")
+            print("❌ No Shared Drive IDs found through file analysis")
         
-        return shared_drives
+        return drive_ids
     
     except Exception as e:
         print(f"❌ Error searching for files: {e}")
-        return []
+        return {}
 
-def get_shared_drives_admin_reports(admin_service):
-    """Try to get Shared Drives information through Admin SDK reports."""
+def discover_drive_ids_from_admin_reports(admin_service):
+    """
+    Try to find Shared Drive IDs through Admin SDK reports.
+    
+    Returns:
+        Dict mapping each candidate drive ID to a hint about where it was seen
+    """
     print_section("METHOD 3: Admin SDK Reports")
     
     try:
         # Get a date 7 days ago to ensure we have data
-        date = (datetime.datetime.now() - datetime.timedelta(days=7)).strftime('%Y-%m-%d')
+        date = (datetime.datetime.utcnow() - datetime.timedelta(days=7)).strftime('%Y-%m-%dT%H:%M:%SZ')
         
-        print(f"Requesting Drive activity report for date {date}...")
-        results = admin_service.activities().list(
-            userKey='all',
-            applicationName='drive',
-            maxResults=1000,
-            actorIpAddress='all',
-            startTime=date
-        ).execute()
+        print(f"Requesting Drive activity report since {date}...")
         
-        activities = results.get('items', [])
-        print(f"Found {len(activities)} Drive activities")
-        
-        # Look for activities related to Shared Drives
+        # Look for activities related to Shared Drives, one page at a time
         drive_ids = {}
-        for activity in activities:
-            events = activity.get('events', [])
-            for event in events:
-                # Check if the event is related to team drives or shared drives
-                parameters = event.get('parameters', [])
-                for param in parameters:
-                    name = param.get('name', '')
-                    value = param.get('value', '')
+        activity_count = 0
+        page_token = None
+        while True:
+            results = execute_with_backoff(admin_service.activities().list(
+                userKey='all',
+                applicationName='drive',
+                maxResults=1000,
+                startTime=date,
+                pageToken=page_token,
+                fields="nextPageToken,items(events(parameters(name,value)))"
+            ))
+            
+            activities = results.get('items', [])
+            activity_count += len(activities)
+            for activity in activities:
+                events = activity.get('events', [])
+                for event in events:
+                    # Check if the event is related to team drives or shared drives
+                    params = {p.get('name'): p.get('value') for p in event.get('parameters', [])}
+                    title = params.get('teamDriveTitle') or params.get('driveTitle')
+                    if title == 'null':
+                        title = None
                     
                     # Look for parameters that might contain Shared Drive IDs
-                    if name in ['teamDriveId', 'teamDriveTitle', 'driveId', 'driveTitle']:
-                        if value and value != 'null':
-                            if name in ['teamDriveId', 'driveId']:
-                                drive_ids[value] = drive_ids.get(value, 'Unknown')
-                            else:  # Title parameters
-                                # Find the corresponding ID parameter
-                                for id_param in parameters:
-                                    id_name = id_param.get('name', '')
-                                    id_value = id_param.get('value', '')
-                                    if id_name in ['teamDriveId', 'driveId'] and id_value:
-                                        drive_ids[id_value] = value
-        
-        print(f"Extracted {len(drive_ids)} potential Shared Drive IDs from activity reports")
-        
-        # Now try to get drive details
-        shared_drives = []
-        drive_service = build('drive', 'v3', credentials=admin_service._http.credentials)
-        
-        for drive_id, name in drive_ids.items():
-            try:
-                drive = drive_service.drives().get(
-                    driveId=drive_id,
-                    fields="id,name,createdTime"
-                ).execute()
-                shared_drives.append(drive)
-                print(f"  Found Shared Drive: {drive.get('name')} (ID: {drive.get('id')})")
-            except HttpError as e:
-                print(f"  Could not retrieve drive with ID {drive_id} (reported name: {name}): {e}")
+                    for id_name in ('teamDriveId', 'driveId'):
+                        drive_id = params.get(id_name)
+                        if not drive_id or drive_id == 'null':
+                            continue
+                        if title:
+                            drive_ids[drive_id] = f"reported name: {title}"
+                        else:
+                            drive_ids.setdefault(drive_id, 'reported name: Unknown')
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
         
-        if shared_drives:
-            print(f"✅ SUCCESS! Found {len(shared_drives)} Shared Drives through Admin reports")
+        print(f"Found {activity_count} Drive activities")
+        
+        if drive_ids:
+            print(f"✅ SUCCESS! Extracted {len(drive_ids)} potential Shared Drive IDs from activity reports")
         else:
-            print("❌ No Shared Drives found through Admin reports")
+            print("❌ No Shared Drive IDs found through Admin reports")
         
-        return shared_drives
+        return drive_ids
     
     except Exception as e:
         print(f"❌ Error accessing Admin Reports: {e}")
         if "Request had insufficient authentication scopes" in str(e):
             print("  Admin SDK Reports require additional scopes. Add 'https://www.googleapis.com/auth/admin.reports.audit.readonly'")
-        return []
+        return {}
 
-def deep_search_for_files(drive_service):
-    """Aggressively search for any files that might be in Shared Drives."""
+def discover_drive_ids_deep(drive_service):
+    """
+    Aggressively search for any files that might be in Shared Drives.
+    
+    Returns:
+        Dict mapping each candidate drive ID to a hint about where it was seen
+    """
     print_section("METHOD 4: Deep File Search")
     
     try:
         print("Performing deep search for files that could reveal Shared Drives...")
-        # Try multiple search strategies
-        search_strategies = [
-            # Try to find any files in team drives
-            {
-                "name": "Files in any Shared Drive",
-                "query": "driveId!=null"
-            },
-            # Files shared with the user
-            {
-                "name": "Files shared with you",
-                "query": "sharedWithMe=true"
-            },
-            # Look for folders (often at the root of Shared Drives)
-            {
-                "name": "Folders",
-                "query": "mimeType='application/vnd.google-apps.folder'"
-            }
-        ]
-        
-        drive_ids = {}
         
-        for strategy in search_strategies:
-            print(f"\nTrying search strategy: {strategy['name']}")
-            try:
-                response = drive_service.files().list(
-                    q=strategy['query'],
-                    includeItemsFromAllDrives=True,
-                    supportsAllDrives=True,
-                    fields="files(id,name,driveId,mimeType)",
-                    pageSize=1000
-                ).execute()
-                
-                files = response.get('files', [])
-                print(f"  Found {len(files)} files/folders")
-                
-                # Extract drive IDs
-                for file in files:
-                    if 'driveId' in file:
-                        drive_id = file['driveId']
-                        if drive_id not in drive_ids:
-                            drive_ids[drive_id] = file.get('name', 'Unknown file')
-                
-                print(f"  Identified {len(drive_ids)} unique drive IDs so far")
-                
-            except HttpError as e:
-                print(f"  ❌ Error with search strategy '{strategy['name']}': {e}")
+        # A single walk over every Drive the user can reach covers what the
+        # separate "in a Shared Drive", "shared with you" and "folders"
+        # searches used to find, without scanning overlapping files 3 times
+        drive_ids, file_count = collect_drive_ids(
+            iter_files(drive_service, "trashed=false", corpora='allDrives'))
         
-        # Try to get drive information for each ID
-        shared_drives = []
-        for drive_id, sample_filename in drive_ids.items():
-            try:
-                drive = drive_service.drives().get(
-                    driveId=drive_id,
-                    fields="id,name,createdTime"
-                ).execute()
-                shared_drives.append(drive)
-                print(f"  Found Shared Drive: {drive.get('name')} (ID: {drive.get('id')})")
-            except HttpError as e:
-                print(f"  Could not retrieve drive with ID {drive_id} (from file: {sample_filename}): {e}")
+        print(f"Found {file_count} files/folders")
         
-        if shared_drives:
-            print(f"✅ SUCCESS! Found {len(shared_drives)} Shared Drives through deep search")
+        if drive_ids:
+            print(f"✅ SUCCESS! Identified {len(drive_ids)} unique drive IDs through deep search")
         else:
-            print("❌ No Shared Drives found through deep search")
+            print("❌ No Shared Drive IDs found through deep search")
         
-        return shared_drives
+        return drive_ids
     
     except Exception as e:
         print(f"❌ Error in deep search: {e}")
+        return {}
+
+def resolve_drives(drive_service, drive_ids, admin_email):
+    """
+    Look up the details of candidate Shared Drive IDs, each exactly once.
+    
+    Args:
+        drive_service: Authenticated Drive API service
+        drive_ids: Dict mapping drive IDs to a hint about where they were seen
+        admin_email: Admin email the drives are looked up as
+        
+    Returns:
+        List of resolved Shared Drive resources
+    """
+    print_section("RESOLVING DISCOVERED DRIVE IDS")
+    
+    if not drive_ids:
+        print("No additional drive IDs to resolve")
+        return []
+    
+    try:
+        print(f"Resolving {len(drive_ids)} drive IDs...")
+        shared_drives, errors = batch_get_drives(drive_service, drive_ids, admin_email)
+    except Exception as e:
+        print(f"❌ Error resolving drive IDs: {e}")
         return []
+    
+    for drive in shared_drives:
+        print(f"  Found Shared Drive: {drive.get('name')} (ID: {drive.get('id')})")
+    for drive_id, e in errors.items():
+        print(f"  Could not retrieve drive with ID {drive_id} ({drive_ids[drive_id]}): {e}")
+    
+    return shared_drives
+
+def run_discovery_methods(methods, all_drives):
+    """
+    Run discovery methods concurrently and merge what they find.
+    
+    Args:
+        methods: List of (method, service) pairs. Each method needs its own
+            service because httplib2 connections are not thread-safe.
+        all_drives: Dict of drive ID to drive resource, updated in place with
+            the drives listed by the standard method
+        
+    Returns:
+        Dict mapping candidate drive IDs from the other methods that are not
+        already in all_drives to a hint about where each was seen
+    """
+    candidate_ids = {}
+    
+    # The methods are independent, so run them concurrently
+    with ThreadPoolExecutor(max_workers=len(methods)) as executor:
+        futures = [
+            (method, executor.submit(method, service))
+            for method, service in methods
+        ]
+        
+        # Merge in method order so earlier methods win on duplicates. The
+        # standard method comes first, so drives it already listed are never
+        # added as candidates that would need resolving.
+        for method, future in futures:
+            try:
+                found = future.result()
+            except Exception as e:
+                print(f"{method.__name__} failed: {e}")
+                continue
+            if method is get_shared_drives_standard:
+                for drive in found:
+                    drive_id = drive.get('id')
+                    if drive_id and drive_id not in all_drives:
+                        all_drives[drive_id] = drive
+            else:
+                for drive_id, hint in found.items():
+                    if drive_id not in all_drives:
+                        candidate_ids.setdefault(drive_id, hint)
+    
+    return candidate_ids
+
+@lru_cache(maxsize=8)
+def _read_service_account_details(service_account_file):
+    """
+    Read the details of a service account key file, once per path.
+    
+    Errors propagate, so lru_cache never caches a failed read. The result
+    is a read-only mapping because it is shared between callers.
+    """
+    with open(service_account_file, 'r') as f:
+        data = json.load(f)
+    
+    return MappingProxyType({
+        'client_id': data.get('client_id', 'Unknown'),
+        'client_email': data.get('client_email', 'Unknown'),
+        'project_id': data.get('project_id', 'Unknown')
+    })
 
 def get_service_account_details(service_account_file):
-    """Extract details from the service account key file."""
+    """Extract details from the service account key file, or 'Unknown' values if it cannot be read."""
     try:
-        with open(service_account_file, 'r') as f:
-            data = json.load(f)
-        
-        return {
-            'client_id': data.get('client_id', 'Unknown'),
-            'client_email': data.get('client_email', 'Unknown'),
-            'project_id': data.get('project_id', 'Unknown')
-        }
+        return _read_service_account_details(service_account_file)
     except Exception as e:
         print(f"Error reading service account file: {e}")
-        return {
+        return MappingProxyType({
             'client_id': 'Unknown',
             'client_email': 'Unknown',
             'project_id': 'Unknown'
-        }
+        })
 
 def main():
     parser = argparse.ArgumentParser(description='Advanced Shared Drive Finder')
     parser.add_argument('--service-account', required=True, help='Path to service account JSON key file')
     parser.add_argument('--admin-email', required=True, help='Admin email for domain-wide delegation')
-    parser.add_argument('--deep-search', action='store_true', help='Enable deep searching techniques (slower)')
+    parser.add_argument('--deep-search', action='store_true', help='Enable deep searching techniques (slower, implies --all-methods)')
+    parser.add_argument('--all-methods', action='store_true',
+                        help='Run the fallback methods even when the standard listing finds Shared Drives')
     parser.add_argument('--output-file', default='found_shared_drives.json', help='Output file for results')
     
     args = parser.parse_args()
@@ -349,23 +619,14 @@ def main():
     print(f"Project ID: {sa_details['project_id']}")
     print(f"Admin Email: {args.admin_email}")
     print(f"Deep Search: {args.deep_search}")
+    print(f"All Methods: {args.all_methods}")
     
     try:
-        # Set up authentication with broader scopes
-        scopes = [
-            'https://www.googleapis.com/auth/drive',
-            'https://www.googleapis.com/auth/drive.readonly',
-            'https://www.googleapis.com/auth/admin.reports.audit.readonly',
-            'https://www.googleapis.com/auth/admin.reports.usage.readonly'
-        ]
-        
-        creds = service_account.Credentials.from_service_account_file(
-            args.service_account, scopes=scopes)
-        creds = creds.with_subject(args.admin_email)
+        # Set up authentication once; every service below shares these credentials
+        creds = make_delegated_creds(args.service_account, args.admin_email)
         
         # Build API services
-        drive_service = build('drive', 'v3', credentials=creds)
-        admin_service = build('admin', 'reports_v1', credentials=creds)
+        drive_service = build_service('drive', 'v3', creds)
         
         # Test API access
         if not test_api_access(drive_service):
@@ -375,37 +636,34 @@ def main():
         # Track all found drives
         all_drives = {}
         
-        # Method 1: Standard API
-        drives1 = get_shared_drives_standard(drive_service)
-        for drive in drives1:
-            drive_id = drive.get('id')
-            if drive_id and drive_id not in all_drives:
-                all_drives[drive_id] = drive
-        
-        # Method 2: Find files in Shared Drives
-        drives2 = get_shared_drives_using_files(drive_service)
-        for drive in drives2:
-            drive_id = drive.get('id')
-            if drive_id and drive_id not in all_drives:
-                all_drives[drive_id] = drive
-        
-        # Method 3: Admin Reports
-        try:
-            drives3 = get_shared_drives_admin_reports(admin_service)
-            for drive in drives3:
-                drive_id = drive.get('id')
-                if drive_id and drive_id not in all_drives:
-                    all_drives[drive_id] = drive
-        except Exception as e:
-            print(f"Admin Reports method failed: {e}")
-        
-        # Method 4: Deep search (optional)
-        if args.deep_search:
-            drives4 = deep_search_for_files(drive_service)
-            for drive in drives4:
-                drive_id = drive.get('id')
-                if drive_id and drive_id not in all_drives:
-                    all_drives[drive_id] = drive
+        # Method 1 lists drives directly; methods 2-4 only discover drive IDs,
+        # which are resolved together afterwards. Method 4 is optional.
+        # Method 1 borrows drive_service, which this thread does not use again
+        # until every method has finished.
+        run_all = args.all_methods or args.deep_search
+        candidate_ids = {}
+        methods = [(get_shared_drives_standard, drive_service)]
+        
+        # Methods 2-4 are fallbacks for broken standard access, so by default
+        # they only run when the standard listing finds nothing
+        if not run_all:
+            run_discovery_methods(methods, all_drives)
+            methods = []
+            if all_drives:
+                print("\nStandard listing found Shared Drives, skipping fallback methods "
+                      "(use --all-methods to run them anyway)")
+        
+        if run_all or not all_drives:
+            methods.append((discover_drive_ids_from_files, build_service('drive', 'v3', creds)))
+            methods.append((discover_drive_ids_from_admin_reports, build_service('admin', 'reports_v1', creds)))
+            if args.deep_search:
+                methods.append((discover_drive_ids_deep, build_service('drive', 'v3', creds)))
+            candidate_ids = run_discovery_methods(methods, all_drives)
+        
+        # Look up every drive ID the standard method did not already return
+        if candidate_ids:
+            for drive in resolve_drives(drive_service, candidate_ids, args.admin_email):
+                all_drives.setdefault(drive['id'], drive)
         
         # Final results
         print_section("FINAL RESULTS")
@@ -413,15 +671,11 @@ def main():
         if all_drives:
             print(f"TOTAL SHARED DRIVES FOUND: {len(all_drives)}")
             
-            # Convert to list for output
-            drives_list = list(all_drives.values())
-            
             # Sort by name for easier viewing
-            drives_list.sort(key=lambda x: x.get('name', '').lower())
+            drives_list = sorted(all_drives.values(), key=lambda x: x.get('name', '').lower())
             
             # Save to output file
-            with open(args.output_file, 'w') as f:
-                json.dump(drives_list, f, indent=2)
+            write_json(args.output_file, drives_list)
             
             print(f"Saved results to {args.output_file}")
             
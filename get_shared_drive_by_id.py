@@ -16,6 +16,27 @@ from googleapiclient.discovery import build
 from google.oauth2 import service_account
 from googleapiclient.errors import HttpError
 
+# Required scopes for Shared Drives access
+SCOPES = [
+    'https://www.googleapis.com/auth/drive',
+    'https://www.googleapis.com/auth/drive.readonly'
+]
+
+def make_delegated_creds(service_account_file, admin_email):
+    """
+    Create service account credentials delegated to the admin user.
+    
+    Args:
+        service_account_file: Path to the service account JSON key file
+        admin_email: Admin email for domain-wide delegation
+        
+    Returns:
+        Delegated Credentials with SCOPES
+    """
+    creds = service_account.Credentials.from_service_account_file(
+        service_account_file, scopes=SCOPES)
+    return creds.with_subject(admin_email)
+
 def main():
     parser = argparse.ArgumentParser(description='Retrieve Google Shared Drive by ID')
     parser.add_argument('--service-account', required=True, help='Path to service account JSON key file')
@@ -25,18 +46,10 @@ def main():
     
     # Authenticate with service account
     try:
-        # Required scopes for Shared Drives access
-        scopes = [
-            'https://www.googleapis.com/auth/drive',
-            'https://www.googleapis.com/auth/drive.readonly'
-        ]
-        
-        creds = service_account.Credentials.from_service_account_file(
-            args.service_account, scopes=scopes)
-        creds = creds.with_subject(args.admin_email)
+        creds = make_delegated_creds(args.service_account, args.admin_email)
         
         # Build the Drive API service
-        drive_service = build('drive', 'v3', credentials=creds)
+        drive_service = build('drive', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
         
         print(f"Attempting to retrieve Shared Drive with ID: {args.drive_id}")
         
@@ -44,7 +57,7 @@ def main():
         try:
             drive = drive_service.drives().get(
                 driveId=args.drive_id, 
-                fields="id,name,createdTime,hidden,restrictions,themeId,backgroundImageFile"
+                fields="id,name,createdTime,hidden,restrictions"
             ).execute()
             
             print("\n✅ SUCCESS! Retrieved Shared Drive details:")
@@ -67,7 +80,7 @@ def main():
                 driveId=args.drive_id,
                 includeItemsFromAllDrives=True,
                 supportsAllDrives=True,
-                fields="files(id,name,mimeType,owners),nextPageToken"
+                fields="files(name,mimeType,owners(displayName)),nextPageToken"
             ).execute()
             
             files = results.get('files', [])
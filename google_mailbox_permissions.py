@@ -24,20 +24,237 @@ python google_mailbox_permissions.py
 """
 
 import os
+import csv
 import json
 import datetime
 import argparse
 import time
-from typing import Dict, Any, List, Tuple
+import random
+import queue
+import threading
+from typing import Dict, Any, Tuple
 
 import pandas as pd
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from google.oauth2 import service_account
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
+from google_auth_httplib2 import AuthorizedHttp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Number of users whose mailbox settings are fetched concurrently
+DEFAULT_MAX_WORKERS = 10
+
+# Largest page size accepted by users().list
+USERS_PAGE_SIZE = 500
+
+# User fields read from the directory listing
+_USER_FIELDS = ('users(primaryEmail,name,isAdmin,isDelegatedAdmin,suspended,isEnrolledIn2Sv,'
+                'isEnforcedIn2Sv,orgUnitPath,isMailboxSetup),nextPageToken')
+
+# Users waiting for a worker; bounds memory while the user list is paged
+USER_QUEUE_SIZE = 500
+
+# Users started per second, kept below the Gmail and Directory API quotas
+DEFAULT_USERS_PER_SECOND = 5
+
+# HTTP statuses retried with exponential backoff: throttling and transient server errors
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+
+# Column layout of the per-user permissions rows
+MAILBOX_COLUMNS = [
+    ('Email', 'string'),
+    ('HasDelegates', 'bool'),
+    ('DelegateCount', 'int64'),
+    ('Delegates', 'list<string>'),
+    ('HasForwarding', 'bool'),
+    ('ForwardingEnabled', 'bool'),
+    ('ForwardingDestination', 'string'),
+    ('ForwardingAddresses', 'list<string>'),
+    ('HasIMAPAccess', 'bool'),
+    ('HasPOPAccess', 'bool'),
+    ('UserIsActive', 'bool'),
+    ('UserIsSuspended', 'bool'),
+    ('IsAdmin', 'bool'),
+    ('IsDelegatedAdmin', 'bool'),
+    ('Has2FA', 'bool'),
+    ('OrgUnitPath', 'string')
+]
+MAILBOX_FIELDS = [name for name, _ in MAILBOX_COLUMNS]
+
+# Rows written between flushes of the permissions CSV
+CSV_FLUSH_EVERY = 100
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH_ROWS = 1000
+
+# Names used in error messages for each batched Gmail settings request
+_SETTINGS_LABELS = {
+    'delegates': 'delegates',
+    'forwarding_addresses': 'forwarding settings',
+    'auto_forward': 'forwarding settings',
+    'imap': 'access settings',
+    'pop': 'access settings'
+}
+
+def _retry_delay(resp, attempt):
+    """Seconds to wait before retrying, preferring the server's Retry-After header."""
+    try:
+        delay = float(resp.get('retry-after', 0))
+    except (TypeError, ValueError):
+        delay = 0
+    return delay or min(60, 2 ** attempt) + random.random()
+
+def _csv_row(permissions_data):
+    """Copy of a permissions record with its list columns joined for CSV output."""
+    row = dict(permissions_data)
+    row['Delegates'] = ','.join(permissions_data.get('Delegates', []))
+    row['ForwardingAddresses'] = ','.join(permissions_data.get('ForwardingAddresses', []))
+    return row
+
+def build_permissions_row(user: Dict[str, Any], settings: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a user's permissions row from already fetched API responses.
+    
+    Pure CPU work with no API calls; it takes microseconds per user, so it
+    runs on the worker thread that fetched the settings.
+    
+    Args:
+        user: Directory API user resource
+        settings: Gmail settings responses as returned by get_mailbox_settings
+        
+    Returns:
+        Dict with mailbox permissions data
+    """
+    permissions_data = {
+        'Email': user.get('primaryEmail', ''),
+        'HasDelegates': False,
+        'DelegateCount': 0,
+        'Delegates': [],
+        'HasForwarding': False,
+        'ForwardingEnabled': False,
+        'ForwardingAddresses': [],
+        'HasIMAPAccess': False,
+        'HasPOPAccess': False,
+        'UserIsActive': not user.get('suspended', False),
+        'UserIsSuspended': user.get('suspended', False),
+        'IsAdmin': user.get('isAdmin', False),
+        'IsDelegatedAdmin': user.get('isDelegatedAdmin', False),
+        'Has2FA': user.get('isEnrolledIn2Sv', False),
+        'OrgUnitPath': user.get('orgUnitPath', '')
+    }
+    
+    # Mail delegates
+    delegates = settings.get('delegates', {}).get('delegates', [])
+    if delegates:
+        permissions_data['HasDelegates'] = True
+        permissions_data['DelegateCount'] = len(delegates)
+        permissions_data['Delegates'] = [d.get('delegateEmail', '') for d in delegates]
+    
+    # Check if there are any forwarding addresses; a dict keeps them
+    # unique in API order with O(1) membership tests
+    forwarding_addresses = settings.get('forwarding_addresses', {}).get('forwardingAddresses', [])
+    unique_addresses = dict.fromkeys(f.get('forwardingEmail', '') for f in forwarding_addresses)
+    if unique_addresses:
+        permissions_data['HasForwarding'] = True
+    
+    # Check if auto-forwarding is enabled
+    auto_forward = settings.get('auto_forward')
+    if auto_forward:
+        permissions_data['ForwardingEnabled'] = auto_forward.get('enabled', False)
+        permissions_data['ForwardingDestination'] = auto_forward.get('emailAddress', '')
+        
+        if permissions_data['ForwardingEnabled']:
+            permissions_data['HasForwarding'] = True
+            unique_addresses.setdefault(permissions_data['ForwardingDestination'])
+    
+    permissions_data['ForwardingAddresses'] = list(unique_addresses)
+    
+    # Mail access settings
+    if 'imap' in settings:
+        permissions_data['HasIMAPAccess'] = settings['imap'].get('enabled', False)
+    
+    if 'pop' in settings:
+        permissions_data['HasPOPAccess'] = settings['pop'].get('accessWindow', 'DISABLED') != 'DISABLED'
+    
+    return permissions_data
+
+def execute_with_backoff(request):
+    """
+    Execute an API request, retrying with exponential backoff on throttling
+    and transient server errors.
+    
+    Args:
+        request: googleapiclient HttpRequest to execute
+        
+    Returns:
+        The API response
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status not in RETRYABLE_STATUSES or attempt == MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(e.resp, attempt))
+
+class RateLimiter:
+    """Thread-safe token bucket that limits how often API calls can start.
+    
+    The bucket holds at least one token, so a rate below one per second
+    still lets a call through every 1/rate seconds.
+    """
+    
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def positive_rate(value: str) -> float:
+    """argparse type for a per-second rate, which must be greater than zero."""
+    rate = float(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than zero, got {value}")
+    return rate
 
 class MailboxPermissionsExporter:
     def __init__(self, domain: str, service_account_file: str, 
-                 admin_email: str, output_dir: str = 'mailbox_permissions'):
+                 admin_email: str, output_dir: str = 'mailbox_permissions',
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_rate: float = DEFAULT_USERS_PER_SECOND,
+                 parquet_output: bool = False, debug_mode: bool = True,
+                 page_size: int = USERS_PAGE_SIZE,
+                 checkpoint_every: int = CSV_FLUSH_EVERY):
         """
         Initialize Mailbox Permissions Exporter.
         
@@ -46,7 +263,16 @@ class MailboxPermissionsExporter:
             service_account_file: Service account credentials file path
             admin_email: Admin email for domain-wide delegation
             output_dir: Directory to save exported data
+            max_workers: Number of users to process concurrently
+            max_rate: Maximum number of users started per second
+            parquet_output: Also stream permissions to a Parquet file (requires pyarrow)
+            debug_mode: Save raw API responses to the raw_data directory
+            page_size: Number of users requested per directory page
+            checkpoint_every: Rows written between flushes of the permissions CSV
         """
+        if parquet_output and pq is None:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow")
+        
         self.domain = domain
         self.service_account_file = service_account_file
         self.admin_email = admin_email
@@ -54,11 +280,21 @@ class MailboxPermissionsExporter:
         self.raw_data_dir = os.path.join(output_dir, "raw_data")
         self.creds = None
         self.services = {}
-        self.debug_mode = True
+        self._gmail_discovery = None
+        self.debug_mode = debug_mode
+        self._raw_queue = None
+        self._raw_writer = None
+        self.max_workers = max_workers
+        self._local = threading.local()
+        self.limiter = RateLimiter(max_rate)
+        self.parquet_output = parquet_output
+        self.page_size = min(page_size, USERS_PAGE_SIZE)
+        self.checkpoint_every = max(checkpoint_every, 1)
         
         # Create output directories
         os.makedirs(output_dir, exist_ok=True)
-        os.makedirs(self.raw_data_dir, exist_ok=True)
+        if debug_mode:
+            os.makedirs(self.raw_data_dir, exist_ok=True)
     
     def authenticate(self):
         """Authenticate with Google Workspace APIs."""
@@ -82,235 +318,270 @@ class MailboxPermissionsExporter:
     def initialize_services(self):
         """Initialize Google Workspace API services."""
         try:
-            self.services['directory'] = build('admin', 'directory_v1', credentials=self.creds)
-            self.services['gmail'] = build('gmail', 'v1', credentials=self.creds)
+            self.services['directory'] = build('admin', 'directory_v1', credentials=self.creds,
+                                               static_discovery=True, cache_discovery=False)
+            # Every user needs their own Gmail service, so read the bundled
+            # discovery document once and build them all from it
+            self._gmail_discovery = get_static_doc('gmail', 'v1')
             print("Services initialized successfully")
         except Exception as e:
             print(f"Error initializing services: {e}")
             raise
     
-    def get_user_details(self, user_email: str) -> Dict[str, Any]:
-        """Get user details from Directory API."""
-        try:
-            user_info = self.services['directory'].users().get(
-                userKey=user_email,
-                fields="primaryEmail,name,isAdmin,isDelegatedAdmin,suspended,isEnrolledIn2Sv,isEnforcedIn2Sv,orgUnitPath"
-            ).execute()
-            
-            # Save raw data
-            if self.debug_mode:
-                with open(os.path.join(self.raw_data_dir, f"{user_email.replace('@', '_')}_user_info.json"), 'w') as f:
-                    json.dump(user_info, f, indent=2)
-            
-            return user_info
-        except Exception as e:
-            print(f"Error getting user details for {user_email}: {e}")
-            return {}
+    def _start_raw_writer(self):
+        """Start the background thread that appends raw API data to JSONL files."""
+        if not self.debug_mode or self._raw_writer is not None:
+            return
+        self._raw_queue = queue.Queue()
+        self._raw_writer = threading.Thread(target=self._write_raw_data, daemon=True)
+        self._raw_writer.start()
     
-    def get_mail_delegates(self, user_email: str) -> List[Dict[str, Any]]:
-        """Get mail delegates for a user using the Gmail API."""
-        delegates = []
-        try:
-            # Create credentials for this specific user
-            user_creds = self.creds.with_subject(user_email)
-            gmail_service = build('gmail', 'v1', credentials=user_creds)
-            
-            # Get delegates
-            results = gmail_service.users().settings().delegates().list(
-                userId='me'
-            ).execute()
-            
-            delegates = results.get('delegates', [])
-            
-            # Save raw data
-            if self.debug_mode:
-                with open(os.path.join(self.raw_data_dir, f"{user_email.replace('@', '_')}_delegates.json"), 'w') as f:
-                    json.dump(delegates, f, indent=2)
-            
-            return delegates
-        except HttpError as e:
-            # Handle specific error cases
-            if e.resp.status == 403:
-                print(f"Access denied for {user_email}'s delegates. This may require additional permissions.")
-            elif e.resp.status == 404:
-                print(f"Delegates endpoint not found for {user_email}. The user may not exist.")
-            else:
-                print(f"Error getting mail delegates for {user_email}: {e}")
-            return []
-        except Exception as e:
-            print(f"Unexpected error getting mail delegates for {user_email}: {e}")
-            return []
+    def _stop_raw_writer(self):
+        """Flush the pending raw API data and stop the writer thread."""
+        if self._raw_writer is None:
+            return
+        self._raw_queue.put(None)
+        self._raw_writer.join()
+        self._raw_queue = None
+        self._raw_writer = None
     
-    def get_forwarding_settings(self, user_email: str) -> List[Dict[str, Any]]:
-        """Get email forwarding settings for a user using the Gmail API."""
-        forwarding = []
+    def _write_raw_data(self):
+        """
+        Append queued raw API data to one JSONL file per kind of data.
+        
+        Runs on a single thread, so workers never wait on file writes.
+        Lines are serialized with orjson when it is installed.
+        """
+        files = {}
         try:
-            # Create credentials for this specific user
-            user_creds = self.creds.with_subject(user_email)
-            gmail_service = build('gmail', 'v1', credentials=user_creds)
-            
-            # Get forwarding settings
-            results = gmail_service.users().settings().forwardingAddresses().list(
-                userId='me'
-            ).execute()
-            
-            forwarding_addresses = results.get('forwardingAddresses', [])
-            
-            # Get auto-forwarding settings
-            auto_forward = gmail_service.users().settings().getAutoForwarding(
-                userId='me'
-            ).execute()
-            
-            forwarding = {
-                'forwarding_addresses': forwarding_addresses,
-                'auto_forward': auto_forward
-            }
-            
-            # Save raw data
-            if self.debug_mode:
-                with open(os.path.join(self.raw_data_dir, f"{user_email.replace('@', '_')}_forwarding.json"), 'w') as f:
-                    json.dump(forwarding, f, indent=2)
-            
-            return forwarding
-        except HttpError as e:
-            # Handle specific error cases
-            if e.resp.status == 403:
-                print(f"Access denied for {user_email}'s forwarding settings. This may require additional permissions.")
-            elif e.resp.status == 404:
-                print(f"Forwarding settings endpoint not found for {user_email}. The user may not exist.")
-            else:
-                print(f"Error getting forwarding settings for {user_email}: {e}")
-            return []
-        except Exception as e:
-            print(f"Unexpected error getting forwarding settings for {user_email}: {e}")
-            return []
+            while True:
+                item = self._raw_queue.get()
+                if item is None:
+                    break
+                kind, user_email, data = item
+                f = files.get(kind)
+                if f is None:
+                    f = files[kind] = open(os.path.join(self.raw_data_dir, f"{kind}.jsonl"), 'wb')
+                record = {'user': user_email, 'data': data}
+                if orjson is not None:
+                    f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+                else:
+                    f.write(json.dumps(record, separators=(',', ':')).encode('utf-8'))
+                    f.write(b'\n')
+        finally:
+            for f in files.values():
+                f.close()
     
-    def get_mail_access_settings(self, user_email: str) -> Dict[str, Any]:
-        """Get IMAP/POP access settings for a user using the Gmail API."""
-        access_settings = {}
-        try:
-            # Create credentials for this specific user
-            user_creds = self.creds.with_subject(user_email)
-            gmail_service = build('gmail', 'v1', credentials=user_creds)
-            
-            # Get IMAP settings
-            imap_settings = gmail_service.users().settings().getImap(
-                userId='me'
-            ).execute()
+    def _save_raw(self, kind: str, user_email: str, data):
+        """Queue raw API data for the JSONL writer when debug mode is on."""
+        if self.debug_mode and self._raw_queue is not None:
+            self._raw_queue.put((kind, user_email, data))
+    
+    def _gmail_service_for(self, user_email: str):
+        """
+        Build a Gmail API service acting as the given user.
+        
+        The service sends its requests over the calling thread's keep-alive
+        connection, so consecutive users on a worker thread share one TLS
+        session instead of opening a new one each.
+        
+        Args:
+            user_email: Email of the user to impersonate
             
-            # Get POP settings
-            pop_settings = gmail_service.users().settings().getPop(
-                userId='me'
-            ).execute()
+        Returns:
+            Gmail API service using credentials delegated to the user
+        """
+        thread_http = getattr(self._local, 'http', None)
+        if thread_http is None:
+            thread_http = build_http()
+            self._local.http = thread_http
+        
+        authed_http = AuthorizedHttp(self.creds.with_subject(user_email), http=thread_http)
+        if self._gmail_discovery is not None:
+            return build_from_document(self._gmail_discovery, http=authed_http)
+        return build('gmail', 'v1', http=authed_http, static_discovery=True, cache_discovery=False)
+    
+    def get_mailbox_settings(self, user_email: str) -> Dict[str, Any]:
+        """
+        Get a user's delegates, forwarding and IMAP/POP settings.
+        
+        The five Gmail settings calls are sent as one HTTP batch request
+        using credentials delegated to the user. Throttled calls and transient
+        server errors are retried with exponential backoff.
+        
+        Args:
+            user_email: Email of the user whose mailbox settings to fetch
             
-            access_settings = {
-                'imap': imap_settings,
-                'pop': pop_settings
+        Returns:
+            Dict of API responses keyed by 'delegates', 'forwarding_addresses',
+            'auto_forward', 'imap' and 'pop'; settings that could not be
+            fetched are left out
+        """
+        settings = {}
+        
+        try:
+            # Create a service for this specific user
+            gmail_service = self._gmail_service_for(user_email)
+            user_settings = gmail_service.users().settings()
+            # Partial responses: only the fields read when building the row
+            requests = {
+                'delegates': lambda: user_settings.delegates().list(
+                    userId='me', fields='delegates(delegateEmail)'),
+                'forwarding_addresses': lambda: user_settings.forwardingAddresses().list(
+                    userId='me', fields='forwardingAddresses(forwardingEmail)'),
+                'auto_forward': lambda: user_settings.getAutoForwarding(
+                    userId='me', fields='enabled,emailAddress'),
+                'imap': lambda: user_settings.getImap(userId='me', fields='enabled'),
+                'pop': lambda: user_settings.getPop(userId='me', fields='accessWindow')
             }
             
-            # Save raw data
-            if self.debug_mode:
-                with open(os.path.join(self.raw_data_dir, f"{user_email.replace('@', '_')}_access_settings.json"), 'w') as f:
-                    json.dump(access_settings, f, indent=2)
-            
-            return access_settings
-        except HttpError as e:
-            # Handle specific error cases
-            if e.resp.status == 403:
-                print(f"Access denied for {user_email}'s access settings. This may require additional permissions.")
-            elif e.resp.status == 404:
-                print(f"Access settings endpoint not found for {user_email}. The user may not exist.")
-            else:
-                print(f"Error getting access settings for {user_email}: {e}")
-            return {}
+            pending = list(requests)
+            attempt = 0
+            while pending:
+                retry = []
+                throttled = []
+                
+                def on_response(request_id, response, exception):
+                    if exception is None:
+                        settings[request_id] = response
+                        return
+                    
+                    # Handle specific error cases
+                    label = _SETTINGS_LABELS[request_id]
+                    status = exception.resp.status if isinstance(exception, HttpError) else None
+                    if status in RETRYABLE_STATUSES and attempt < MAX_RETRIES:
+                        retry.append(request_id)
+                        throttled.append(exception.resp)
+                    elif status == 403:
+                        print(f"Access denied for {user_email}'s {label}. This may require additional permissions.")
+                    elif status == 404:
+                        print(f"{label.capitalize()} endpoint not found for {user_email}. The user may not exist.")
+                    else:
+                        print(f"Error getting {label} for {user_email}: {exception}")
+                
+                batch = gmail_service.new_batch_http_request(callback=on_response)
+                for request_id in pending:
+                    batch.add(requests[request_id](), request_id=request_id)
+                try:
+                    batch.execute()
+                except HttpError as e:
+                    # A failed batch envelope means no call ran; retry them all
+                    if e.resp.status not in RETRYABLE_STATUSES or attempt >= MAX_RETRIES:
+                        raise
+                    retry.extend(pending)
+                    throttled.append(e.resp)
+                
+                if retry:
+                    time.sleep(_retry_delay(throttled[-1], attempt))
+                    attempt += 1
+                pending = retry
         except Exception as e:
-            print(f"Unexpected error getting access settings for {user_email}: {e}")
-            return {}
+            print(f"Unexpected error getting mailbox settings for {user_email}: {e}")
+        
+        # Save raw data
+        if settings:
+            self._save_raw('mailbox_settings', user_email, settings)
+        
+        return settings
     
-    def process_user_mailbox_permissions(self, user_email: str) -> Dict[str, Any]:
+    def process_user_mailbox_permissions(self, user: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process mailbox permissions for a single user.
         
         Args:
-            user_email: Email of the user to process
+            user: Directory API user resource of the user to process
             
         Returns:
             Dict with mailbox permissions data
         """
-        print(f"Processing mailbox permissions for {user_email}")
+        user_email = user.get('primaryEmail', '')
+        
+        # User details come with the directory listing
+        self._save_raw('user_info', user_email, user)
         
-        # Initialize permissions data
-        permissions_data = {
-            'Email': user_email,
-            'HasDelegates': False,
-            'DelegateCount': 0,
-            'Delegates': [],
-            'HasForwarding': False,
-            'ForwardingEnabled': False,
-            'ForwardingAddresses': [],
-            'HasIMAPAccess': False,
-            'HasPOPAccess': False,
-            'UserIsActive': True,
-            'UserIsSuspended': False
-        }
+        # Gmail settings calls fail for accounts without a mailbox
+        if not user.get('isMailboxSetup', True):
+            print(f"Skipping mailbox settings for {user_email}: no Gmail mailbox")
+            return build_permissions_row(user, {})
+        
+        self.limiter.acquire()
+        print(f"Processing mailbox permissions for {user_email}")
         
         try:
-            # Get user details
-            user_info = self.get_user_details(user_email)
-            if user_info:
-                permissions_data['UserIsActive'] = not user_info.get('suspended', False)
-                permissions_data['UserIsSuspended'] = user_info.get('suspended', False)
-                permissions_data['IsAdmin'] = user_info.get('isAdmin', False)
-                permissions_data['IsDelegatedAdmin'] = user_info.get('isDelegatedAdmin', False)
-                permissions_data['Has2FA'] = user_info.get('isEnrolledIn2Sv', False)
-                permissions_data['OrgUnitPath'] = user_info.get('orgUnitPath', '')
-            
-            # Skip suspended users
-            if permissions_data['UserIsSuspended']:
-                print(f"Skipping suspended user: {user_email}")
-                return permissions_data
+            # Get all mailbox settings in one batch request
+            settings = self.get_mailbox_settings(user_email)
+            return build_permissions_row(user, settings)
             
-            # Get mail delegates
-            delegates = self.get_mail_delegates(user_email)
-            if delegates:
-                permissions_data['HasDelegates'] = True
-                permissions_data['DelegateCount'] = len(delegates)
-                permissions_data['Delegates'] = [d.get('delegateEmail', '') for d in delegates]
-            
-            # Get forwarding settings
-            forwarding = self.get_forwarding_settings(user_email)
-            if forwarding:
-                # Check if there are any forwarding addresses
-                if 'forwarding_addresses' in forwarding and forwarding['forwarding_addresses']:
-                    permissions_data['HasForwarding'] = True
-                    permissions_data['ForwardingAddresses'] = [
-                        f.get('forwardingEmail', '') for f in forwarding['forwarding_addresses']
-                    ]
-                
-                # Check if auto-forwarding is enabled
-                if 'auto_forward' in forwarding and forwarding['auto_forward']:
-                    permissions_data['ForwardingEnabled'] = forwarding['auto_forward'].get('enabled', False)
-                    permissions_data['ForwardingDestination'] = forwarding['auto_forward'].get('emailAddress', '')
-                    
-                    if permissions_data['ForwardingEnabled']:
-                        permissions_data['HasForwarding'] = True
-                        if permissions_data['ForwardingDestination'] not in permissions_data['ForwardingAddresses']:
-                            permissions_data['ForwardingAddresses'].append(permissions_data['ForwardingDestination'])
+        except Exception as e:
+            print(f"Error processing mailbox permissions for {user_email}: {e}")
+            return build_permissions_row(user, {})
+    
+    def _mailbox_worker(self, user_queue, record):
+        """
+        Process users from the queue until a None sentinel arrives.
+        
+        A failure on one user is reported and skipped, so the worker keeps
+        draining the queue and the producer never blocks on a full queue.
+        
+        Args:
+            user_queue: Queue of Directory API users to process
+            record: Thread-safe callable that stores each user's permissions data
+        """
+        while True:
+            user = user_queue.get()
+            if user is None:
+                return
+            try:
+                record(self.process_user_mailbox_permissions(user))
+            except Exception as e:
+                print(f"Error recording permissions for {user.get('primaryEmail', '')}: {e}")
+    
+    def _iter_active_users(self, max_users: int):
+        """
+        Yield active users from the Directory API as each page arrives.
+        
+        Suspended users are filtered out by the API query, so they cost no
+        page fetches; the client-side check only guards against stale results.
+        
+        Args:
+            max_users: Maximum number of users to yield (0 for all)
             
-            # Get mail access settings
-            access_settings = self.get_mail_access_settings(user_email)
-            if access_settings:
-                if 'imap' in access_settings:
-                    permissions_data['HasIMAPAccess'] = access_settings['imap'].get('enabled', False)
+        Yields:
+            Directory API user resources
+        """
+        user_count = 0
+        page_token = None
+        
+        while True:
+            # Get a batch of users
+            results = execute_with_backoff(self.services['directory'].users().list(
+                customer='my_customer',
+                maxResults=self.page_size,
+                orderBy='email',
+                query='isSuspended=false',
+                pageToken=page_token,
+                fields=_USER_FIELDS
+            ))
+            
+            users = results.get('users', [])
+            if not users:
+                return
+            
+            print(f"Found {len(users)} users")
+            
+            for user in users:
+                if user.get('suspended', False):
+                    continue
+                yield user
                 
-                if 'pop' in access_settings:
-                    permissions_data['HasPOPAccess'] = access_settings['pop'].get('accessWindow', 'DISABLED') != 'DISABLED'
-            
-            return permissions_data
+                user_count += 1
+                if user_count >= max_users and max_users > 0:
+                    print(f"Reached maximum user limit of {max_users}")
+                    return
             
-        except Exception as e:
-            print(f"Error processing mailbox permissions for {user_email}: {e}")
-            return permissions_data
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return
     
     def export_mailbox_permissions(self, max_users=10):
         """
@@ -323,60 +594,69 @@ class MailboxPermissionsExporter:
             DataFrame with mailbox permissions data
         """
         permissions_list = []
-        user_count = 0
-        page_token = None
+        
+        # Rows are written as each user completes, so an interrupted run
+        # still leaves every finished user on disk
+        csv_path = os.path.join(self.output_dir, "mailbox_permissions_complete.csv")
+        csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+        writer = csv.DictWriter(csv_file, fieldnames=MAILBOX_FIELDS, restval='')
+        writer.writeheader()
+        lock = threading.Lock()
+        
+        # Delegates and forwarding addresses stay list<string> columns in Parquet
+        parquet_path = os.path.join(self.output_dir, "mailbox_permissions.parquet")
+        parquet_writer = self._open_parquet_writer(parquet_path) if self.parquet_output else None
+        parquet_rows = []
+        
+        def record(permissions_data):
+            with lock:
+                permissions_list.append(permissions_data)
+                writer.writerow(_csv_row(permissions_data))
+                if len(permissions_list) % self.checkpoint_every == 0:
+                    csv_file.flush()
+                if parquet_writer is not None:
+                    parquet_rows.append(permissions_data)
+                    if len(parquet_rows) >= PARQUET_BATCH_ROWS:
+                        self._write_parquet_rows(parquet_writer, parquet_rows)
+                        parquet_rows.clear()
+        
+        # Users are I/O bound, so worker threads process them while this
+        # thread keeps paging the user list into a bounded queue
+        user_queue = queue.Queue(maxsize=USER_QUEUE_SIZE)
+        workers = [
+            threading.Thread(target=self._mailbox_worker, args=(user_queue, record), daemon=True)
+            for _ in range(self.max_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        self._start_raw_writer()
         
         try:
-            while True:
-                # Get a batch of users
-                results = self.services['directory'].users().list(
-                    customer='my_customer',
-                    maxResults=100,
-                    orderBy='email',
-                    pageToken=page_token,
-                    fields='users(primaryEmail,suspended),nextPageToken'
-                ).execute()
-                
-                users = results.get('users', [])
-                if not users:
-                    break
-                
-                print(f"Found {len(users)} users")
-                
-                # Process users
-                for i, user in enumerate(users):
-                    email = user.get('primaryEmail', '')
-                    is_suspended = user.get('suspended', False)
-                    
-                    if not is_suspended:  # Skip suspended users
-                        print(f"\nProcessing user {i+1}/{len(users)}: {email}")
-                        
-                        # Get mailbox permissions
-                        permissions_data = self.process_user_mailbox_permissions(email)
-                        permissions_list.append(permissions_data)
-                        
-                        user_count += 1
-                        if user_count >= max_users and max_users > 0:
-                            print(f"Reached maximum user limit of {max_users}")
-                            break
-                        
-                        # Small delay to avoid rate limiting
-                        time.sleep(1)
-                
-                if user_count >= max_users and max_users > 0:
-                    break
-                
-                page_token = results.get('nextPageToken')
-                if not page_token:
-                    break
-                
-                # Save intermediate results
-                if len(permissions_list) % 10 == 0:
-                    self._save_to_csv(permissions_list, f"mailbox_permissions_partial_{len(permissions_list)}.csv")
+            try:
+                # Queue users for the workers as each directory page arrives
+                for user in self._iter_active_users(max_users):
+                    print(f"\nQueueing user: {user.get('primaryEmail', '')}")
+                    user_queue.put(user)
+            finally:
+                # One sentinel per worker, then wait for the queue to drain
+                for _ in workers:
+                    user_queue.put(None)
+                for worker in workers:
+                    worker.join()
+                self._stop_raw_writer()
+                csv_file.close()
+                if parquet_writer is not None:
+                    if parquet_rows:
+                        self._write_parquet_rows(parquet_writer, parquet_rows)
+                    parquet_writer.close()
+                    print(f"Saved {len(permissions_list)} records to {parquet_path}")
+            
+            # Workers finish out of order; restore the directory's email order
+            permissions_list.sort(key=lambda item: item['Email'])
             
             # Save final results
             if permissions_list:
-                self._save_to_csv(permissions_list, "mailbox_permissions_complete.csv")
+                print(f"Saved {len(permissions_list)} records to {csv_path}")
                 
                 # Save detailed delegate information
                 self._save_detailed_delegates(permissions_list)
@@ -389,80 +669,57 @@ class MailboxPermissionsExporter:
         except Exception as e:
             print(f"Error exporting mailbox permissions: {e}")
             
-            # Save what we have
+            # Everything processed so far is already in the CSV
             if permissions_list:
-                self._save_to_csv(permissions_list, "mailbox_permissions_error.csv")
+                print(f"Saved {len(permissions_list)} records to {csv_path} before the error")
             
             return pd.DataFrame(permissions_list)
     
-    def _save_to_csv(self, data, filename):
-        """Helper method to save data to CSV."""
-        if data:
-            # Convert list data to strings for CSV export
-            for item in data:
-                if 'Delegates' in item and isinstance(item['Delegates'], list):
-                    item['Delegates'] = ','.join(item['Delegates'])
-                if 'ForwardingAddresses' in item and isinstance(item['ForwardingAddresses'], list):
-                    item['ForwardingAddresses'] = ','.join(item['ForwardingAddresses'])
-            
-            df = pd.DataFrame(data)
-            csv_path = os.path.join(self.output_dir, filename)
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Saved {len(data)} records to {csv_path}")
-        else:
-            print("No data to save")
+    def _open_parquet_writer(self, parquet_path):
+        """Open a zstd-compressed Parquet writer using the permissions schema."""
+        schema = pa.schema([
+            (name, pa.list_(pa.string()) if type_name == 'list<string>' else pa.type_for_alias(type_name))
+            for name, type_name in MAILBOX_COLUMNS
+        ])
+        return pq.ParquetWriter(parquet_path, schema, compression='zstd')
+    
+    def _write_parquet_rows(self, writer, rows):
+        """Append permissions rows to an open Parquet writer as a single row group."""
+        writer.write_table(pa.Table.from_pylist(rows, schema=writer.schema))
     
     def _save_detailed_delegates(self, permissions_list):
         """Save detailed delegate information to CSV."""
-        delegate_records = []
+        delegate_rows = [
+            (perm.get('Email', ''), delegate.strip())
+            for perm in permissions_list
+            for delegate in perm.get('Delegates', [])
+            if delegate
+        ]
         
-        for perm in permissions_list:
-            email = perm.get('Email', '')
-            delegates = perm.get('Delegates', [])
-            
-            if isinstance(delegates, str):
-                delegates = delegates.split(',') if delegates else []
-            
-            for delegate in delegates:
-                if delegate:
-                    record = {
-                        'Mailbox': email,
-                        'Delegate': delegate.strip()
-                    }
-                    delegate_records.append(record)
-        
-        if delegate_records:
-            df = pd.DataFrame(delegate_records)
+        if delegate_rows:
             csv_path = os.path.join(self.output_dir, "detailed_delegates.csv")
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Saved {len(delegate_records)} delegate records to {csv_path}")
+            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Mailbox', 'Delegate'])
+                writer.writerows(delegate_rows)
+            print(f"Saved {len(delegate_rows)} delegate records to {csv_path}")
     
     def _save_detailed_forwarding(self, permissions_list):
         """Save detailed forwarding information to CSV."""
-        forwarding_records = []
+        forwarding_rows = [
+            (perm.get('Email', ''), fwd_address.strip(), perm.get('ForwardingEnabled', False))
+            for perm in permissions_list
+            for fwd_address in perm.get('ForwardingAddresses', [])
+            if fwd_address
+        ]
         
-        for perm in permissions_list:
-            email = perm.get('Email', '')
-            forwarding_addresses = perm.get('ForwardingAddresses', [])
-            forwarding_enabled = perm.get('ForwardingEnabled', False)
-            
-            if isinstance(forwarding_addresses, str):
-                forwarding_addresses = forwarding_addresses.split(',') if forwarding_addresses else []
-            
-            for fwd_address in forwarding_addresses:
-                if fwd_address:
-                    record = {
-                        'Mailbox': email,
-                        'ForwardingAddress': fwd_address.strip(),
-                        'AutoForwardingEnabled': forwarding_enabled
-                    }
-                    forwarding_records.append(record)
-        
-        if forwarding_records:
-            df = pd.DataFrame(forwarding_records)
+        if forwarding_rows:
             csv_path = os.path.join(self.output_dir, "detailed_forwarding.csv")
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Saved {len(forwarding_records)} forwarding records to {csv_path}")
+            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Mailbox', 'ForwardingAddress', 'AutoForwardingEnabled'])
+                writer.writerows(forwarding_rows)
+            print(f"Saved {len(forwarding_rows)} forwarding records to {csv_path}")
 
 def main():
     parser = argparse.ArgumentParser(description='Google Workspace Mailbox Permissions Exporter')
@@ -471,6 +728,18 @@ def main():
     parser.add_argument('--admin-email', required=True, help='Admin email for domain-wide delegation')
     parser.add_argument('--output-dir', default='mailbox_permissions', help='Directory to save exported data')
     parser.add_argument('--max-users', type=int, default=10, help='Maximum number of users to process (0 for all)')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f'Number of users to process concurrently (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--max-rate', type=positive_rate, default=DEFAULT_USERS_PER_SECOND,
+                        help=f'Maximum number of users started per second (default: {DEFAULT_USERS_PER_SECOND})')
+    parser.add_argument('--parquet', action='store_true',
+                        help='Also stream permissions to a zstd-compressed Parquet file (requires pyarrow)')
+    parser.add_argument('--page-size', type=int, default=USERS_PAGE_SIZE,
+                        help=f'Number of users requested per directory page (default and maximum: {USERS_PAGE_SIZE})')
+    parser.add_argument('--checkpoint-every', type=int, default=CSV_FLUSH_EVERY,
+                        help=f'Flush the permissions CSV to disk every N users (default: {CSV_FLUSH_EVERY})')
+    parser.add_argument('--no-debug', action='store_true',
+                        help='Do not save raw API responses to the raw_data directory')
     
     args = parser.parse_args()
     
@@ -480,7 +749,13 @@ def main():
             domain=args.domain,
             service_account_file=args.service_account,
             admin_email=args.admin_email,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            max_workers=args.max_workers,
+            max_rate=args.max_rate,
+            parquet_output=args.parquet,
+            debug_mode=not args.no_debug,
+            page_size=args.page_size,
+            checkpoint_every=args.checkpoint_every
         )
         
         # Authenticate and initialize services
@@ -19,9 +19,14 @@ python google_shared_drives_exporter.py
 """
 
 import os
+import csv
 import json
 import argparse
 import time
+import random
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple
 
 import pandas as pd
@@ -29,9 +34,146 @@ from googleapiclient.discovery import build
 from google.oauth2 import service_account
 from googleapiclient.errors import HttpError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Maximum number of calls per Drive batch request
+BATCH_SIZE = 100
+
+# Number of Drive batches or drives fetched concurrently
+DEFAULT_MAX_WORKERS = 5
+
+# Drive API calls started per second, counting each call inside a batch
+DEFAULT_REQUESTS_PER_SECOND = 50
+
+# HTTP statuses retried with exponential backoff: throttling and transient server errors
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+
+# Drives per storage batch; each drive adds two calls
+STORAGE_BATCH_DRIVES = BATCH_SIZE // 2
+
+# MIME type of Drive folders
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Columns of shared_drive_permissions_export.csv
+PERMISSION_COLUMNS = [
+    'Drive ID', 'Drive Name', 'Permission ID', 'Type', 'Email Address', 'Role',
+    'Display Name', 'Domain', 'Expiration Time', 'Deleted', 'Pending Owner'
+]
+
+# On-disk cache of drive permissions and storage, reused for DRIVE_CACHE_TTL
+# seconds, relative to the output directory
+DRIVE_CACHE_FILE = '.drive_cache.db'
+DRIVE_CACHE_TTL = 86400
+_CACHE_TABLES = ('drive_permissions', 'drive_storage')
+
+# Per-drive changes feed positions saved by --incremental, relative to the output directory
+STATE_FILE = '.state.json'
+
+# Shared Drive resource fields and the CSV columns they are exported as
+DRIVE_COLUMNS = {
+    'id': 'Drive ID',
+    'name': 'Drive Name',
+    'createdTime': 'Created Time',
+    'hidden': 'Hidden',
+    'restrictions': 'Restrictions'
+}
+
+# Fields requested for each page of Shared Drive permissions
+PERMISSION_FIELDS = ("nextPageToken, permissions(id, type, emailAddress, role, displayName, "
+                     "domain, expirationTime, deleted, pendingOwner)")
+
+def _retry_delay(resp, attempt):
+    """Seconds to wait before retrying, preferring the server's Retry-After header."""
+    try:
+        delay = float(resp.get('retry-after', 0))
+    except (TypeError, ValueError):
+        delay = 0
+    return delay or min(60, 2 ** attempt) + random.random()
+
+def _is_retryable(exception):
+    """Whether an API error is throttling or a transient server error worth retrying."""
+    if not isinstance(exception, HttpError):
+        return False
+    if exception.resp.status in RETRYABLE_STATUSES:
+        return True
+    # Drive reports exceeded rate limits as 403 rateLimitExceeded/userRateLimitExceeded
+    return exception.resp.status == 403 and b'ratelimitexceeded' in (exception.content or b'').lower()
+
+def execute_with_backoff(request):
+    """
+    Execute an API or batch request, retrying with exponential backoff on
+    throttling and transient server errors.
+    
+    Args:
+        request: googleapiclient HttpRequest or BatchHttpRequest to execute
+        
+    Returns:
+        The API response
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if not _is_retryable(e) or attempt == MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(e.resp, attempt))
+
+def write_json(path, data):
+    """Write data to a JSON file indented by 2 spaces, using orjson when it is installed."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+class RateLimiter:
+    """Thread-safe token bucket that limits how often API calls can start.
+    
+    The bucket holds at least one token, so a rate below one per second
+    still lets a call through every 1/rate seconds.
+    """
+    
+    def __init__(self, rate: float):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Take one token, sleeping only when the bucket is empty."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+def positive_rate(value: str) -> float:
+    """argparse type for a per-second rate, which must be greater than zero."""
+    rate = float(value)
+    if rate <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than zero, got {value}")
+    return rate
+
 class SharedDrivesExporter:
     def __init__(self, service_account_file: str, 
-                 admin_email: str, output_dir: str = 'workspace_exports'):
+                 admin_email: str, output_dir: str = 'workspace_exports',
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 cache_ttl: int = DRIVE_CACHE_TTL,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 incremental: bool = False):
         """
         Initialize Google Shared Drives Exporter.
         
@@ -39,6 +181,11 @@ class SharedDrivesExporter:
             service_account_file: Service account credentials file path
             admin_email: Admin email for domain-wide delegation
             output_dir: Directory to save exported data
+            max_workers: Number of Drive batches or drives fetched concurrently
+            cache_ttl: Seconds cached permissions and storage stay valid (0 disables the cache)
+            requests_per_second: Maximum sustained Drive API request rate
+            incremental: Reuse cached storage data of drives whose changes feed
+                         is empty since the previous incremental run
         """
         self.service_account_file = service_account_file
         self.admin_email = admin_email
@@ -46,10 +193,26 @@ class SharedDrivesExporter:
         self.raw_data_dir = os.path.join(output_dir, "raw_data")
         self.creds = None
         self.drive_service = None
+        self.max_workers = max_workers
+        self._local = threading.local()
+        # One long-lived pool, so each worker thread keeps its Drive service
+        # and keep-alive connection across batches and exports
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.cache_ttl = cache_ttl
+        self.limiter = RateLimiter(requests_per_second)
+        self.incremental = incremental
+        self.cache_path = os.path.join(output_dir, DRIVE_CACHE_FILE)
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        self.state = {}
         
         # Create output directories
         os.makedirs(output_dir, exist_ok=True)
         os.makedirs(self.raw_data_dir, exist_ok=True)
+        
+        # Start page tokens of each drive's changes feed from the previous run
+        if incremental and os.path.exists(self.state_path):
+            with open(self.state_path, 'r') as f:
+                self.state = json.load(f)
     
     def authenticate(self):
         """Authenticate with Google Drive API."""
@@ -76,18 +239,104 @@ class SharedDrivesExporter:
     def initialize_service(self):
         """Initialize Google Drive API service."""
         try:
-            self.drive_service = build('drive', 'v3', credentials=self.creds)
+            self.drive_service = build('drive', 'v3', credentials=self.creds, static_discovery=True, cache_discovery=False)
             print("Drive service initialized successfully")
         except Exception as e:
             print(f"Error initializing Drive service: {e}")
             raise
     
+    def _thread_drive_service(self):
+        """
+        Drive API service for the calling thread, since httplib2 is not thread-safe.
+        
+        The service is built once per thread and reused, so its HTTP
+        connection stays open and later requests skip the TCP/TLS handshake.
+        """
+        drive_service = getattr(self._local, 'drive_service', None)
+        if drive_service is None:
+            drive_service = build('drive', 'v3', credentials=self.creds, static_discovery=True, cache_discovery=False)
+            self._local.drive_service = drive_service
+        return drive_service
+    
+    def _execute(self, request):
+        """Execute a single API request within the rate limit, retrying transient errors."""
+        self.limiter.acquire()
+        return execute_with_backoff(request)
+    
+    def _open_cache(self):
+        """
+        Open the on-disk drive cache, creating its tables if needed.
+        
+        A new connection is opened per call so exports running on
+        different threads never share one.
+        
+        Returns:
+            sqlite3 connection to DRIVE_CACHE_FILE in the output directory
+        """
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        for table in _CACHE_TABLES:
+            conn.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} '
+                '(id TEXT PRIMARY KEY, data TEXT NOT NULL, fetched_ts INTEGER NOT NULL)'
+            )
+        return conn
+    
+    def _cache_get(self, table, ids, max_age=None):
+        """
+        Look up entries cached within the last cache_ttl seconds.
+        
+        Args:
+            table: One of _CACHE_TABLES
+            ids: Drive IDs to look up
+            max_age: Optional age limit in seconds instead of cache_ttl
+            
+        Returns:
+            Dict mapping each fresh drive ID to its cached data
+        """
+        if self.cache_ttl <= 0:
+            return {}
+        cutoff = int(time.time()) - (self.cache_ttl if max_age is None else max_age)
+        cached = {}
+        conn = self._open_cache()
+        try:
+            for drive_id in ids:
+                row = conn.execute(
+                    f'SELECT data FROM {table} WHERE id = ? AND fetched_ts > ?', (drive_id, cutoff)
+                ).fetchone()
+                if row:
+                    cached[drive_id] = json.loads(row[0])
+        finally:
+            conn.close()
+        return cached
+    
+    def _cache_put(self, table, items):
+        """
+        Store freshly fetched entries in the cache.
+        
+        Args:
+            table: One of _CACHE_TABLES
+            items: Dict mapping drive IDs to JSON-serializable data
+        """
+        if self.cache_ttl <= 0 or not items:
+            return
+        now = int(time.time())
+        conn = self._open_cache()
+        try:
+            with conn:
+                conn.executemany(
+                    f'INSERT OR REPLACE INTO {table} (id, data, fetched_ts) VALUES (?, ?, ?)',
+                    [(drive_id, json.dumps(data), now) for drive_id, data in items.items()]
+                )
+        finally:
+            conn.close()
+    
     def export_shared_drives(self):
         """
         Export all Shared Drives in the organization to a CSV file.
         
         Returns:
-            Tuple containing DataFrame with Shared Drives data and path to the CSV file
+            Tuple containing the list of Shared Drive resources, a DataFrame with
+            Shared Drives data and path to the CSV file
         """
         print("\nExporting Shared Drives...")
         shared_drives = []
@@ -96,7 +345,7 @@ class SharedDrivesExporter:
         # First test a basic API call to verify credentials and access
         try:
             print("Testing API access first...")
-            about = self.drive_service.about().get(fields="user,storageQuota").execute()
+            about = self.drive_service.about().get(fields="user(emailAddress),storageQuota(limit)").execute()
             print(f"Successfully authenticated as: {about.get('user', {}).get('emailAddress')}")
             print(f"Drive storage quota: {about.get('storageQuota', {}).get('limit', 'Unknown')} bytes")
         except Exception as e:
@@ -114,12 +363,12 @@ class SharedDrivesExporter:
             print("Attempting to list Shared Drives...")
             while True:
                 try:
-                    results = self.drive_service.drives().list(
+                    results = self._execute(self.drive_service.drives().list(
                         pageSize=100,
                         pageToken=page_token,
                         useDomainAdminAccess=True,
                         fields="nextPageToken, drives(id, name, createdTime, hidden, restrictions)"
-                    ).execute()
+                    ))
                     
                     current_drives = results.get('drives', [])
                     print(f"API returned {len(current_drives)} drives in current page")
@@ -143,11 +392,11 @@ class SharedDrivesExporter:
                     if "useDomainAdminAccess" in str(e) and e.resp.status == 400:
                         print("WARNING: useDomainAdminAccess parameter not supported, retrying without it...")
                         # Try again without the useDomainAdminAccess parameter
-                        results = self.drive_service.drives().list(
+                        results = self._execute(self.drive_service.drives().list(
                             pageSize=100,
                             pageToken=page_token,
                             fields="nextPageToken, drives(id, name, createdTime, hidden, restrictions)"
-                        ).execute()
+                        ))
                         
                         current_drives = results.get('drives', [])
                         if not current_drives:
@@ -162,226 +411,279 @@ class SharedDrivesExporter:
                     else:
                         print(f"ERROR in API call: {e}")
                         raise
-                
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
             
             # Save the raw data
-            with open(os.path.join(self.raw_data_dir, 'shared_drives_raw.json'), 'w') as f:
-                json.dump(shared_drives, f, indent=2)
-            
-            # Prepare data for CSV export
-            shared_drives_data = []
-            for drive in shared_drives:
-                # Extract and format restrictions
-                restrictions = drive.get('restrictions', {})
-                restrictions_str = '; '.join([f"{k}: {v}" for k, v in restrictions.items()])
-                
-                drive_data = {
-                    'Drive ID': drive.get('id', ''),
-                    'Drive Name': drive.get('name', ''),
-                    'Created Time': drive.get('createdTime', ''),
-                    'Hidden': drive.get('hidden', False),
-                    'Restrictions': restrictions_str
-                }
-                shared_drives_data.append(drive_data)
+            write_json(os.path.join(self.raw_data_dir, 'shared_drives_raw.json'), shared_drives)
             
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(shared_drives_data)
+            # Build the DataFrame straight from the API resources, keeping only the exported fields
+            df = pd.DataFrame(shared_drives, columns=list(DRIVE_COLUMNS))
+            df['restrictions'] = df['restrictions'].map(
+                lambda restrictions: '; '.join(f"{k}: {v}" for k, v in restrictions.items())
+                if isinstance(restrictions, dict) else ''
+            )
+            df = df.fillna({'id': '', 'name': '', 'createdTime': '', 'hidden': False}).rename(columns=DRIVE_COLUMNS)
+            
+            # Export to CSV
             csv_path = os.path.join(self.output_dir, 'shared_drives_export.csv')
             df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Exported {len(shared_drives_data)} shared drives to {csv_path}")
+            print(f"Exported {len(df)} shared drives to {csv_path}")
             
-            return df, csv_path
+            return shared_drives, df, csv_path
             
         except Exception as e:
             print(f"Error exporting shared drives: {e}")
-            return pd.DataFrame(), ""
+            return [], pd.DataFrame(), ""
     
-    def export_shared_drive_permissions(self, drives_df=None):
+    def export_shared_drive_permissions(self, drives=None):
         """
         Export all permissions for each Shared Drive to a CSV file.
         
         Args:
-            drives_df: Optional DataFrame with drives data from export_shared_drives().
-                       If not provided, will fetch drives first.
+            drives: Optional list of Shared Drive resources from export_shared_drives().
+                    If not provided, will fetch drives first.
         
         Returns:
-            Tuple containing DataFrame with permissions data and path to the CSV file
+            Tuple containing the number of permissions exported and path to the CSV file
         """
         print("\nExporting Shared Drive permissions...")
         
-        # If drives_df not provided, fetch drives first
-        if drives_df is None or drives_df.empty:
-            drives_df, _ = self.export_shared_drives()
+        # If drives not provided, fetch drives first
+        if not drives:
+            drives, _, _ = self.export_shared_drives()
         
-        if drives_df.empty:
+        if not drives:
             print("No shared drives available to export permissions for.")
-            return pd.DataFrame(), ""
-        
-        all_permissions = []
+            return 0, ""
         
-        # For progress tracking
-        total_drives = len(drives_df)
-        processed = 0
+        permission_count = 0
+        total_drives = len(drives)
         
         try:
-            for _, drive in drives_df.iterrows():
-                drive_id = drive['Drive ID']
-                drive_name = drive['Drive Name']
-                
-                processed += 1
-                if processed % 5 == 0 or processed == total_drives:
-                    print(f"Processing shared drive {processed}/{total_drives}: {drive_name}")
-                
-                # Get all permissions for this drive
-                permissions = []
-                page_token = None
+            # Only drives without fresh cached permissions are fetched
+            drive_names = {drive['id']: drive.get('name', '') for drive in drives}
+            cached = self._cache_get('drive_permissions', list(drive_names))
+            if cached:
+                print(f"Using cached permissions for {len(cached)} shared drives")
+            
+            # Rows are streamed to the CSV as each drive's listing finishes,
+            # instead of collected in a DataFrame
+            csv_path = os.path.join(self.output_dir, 'shared_drive_permissions_export.csv')
+            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=PERMISSION_COLUMNS)
+                writer.writeheader()
                 
-                while True:
-                    try:
-                        results = self.drive_service.permissions().list(
-                            fileId=drive_id,
-                            supportsAllDrives=True,
-                            fields="nextPageToken, permissions(id, type, emailAddress, role, displayName, domain, expirationTime, deleted, pendingOwner)",
-                            pageToken=page_token
-                        ).execute()
-                        
-                        current_permissions = results.get('permissions', [])
-                        if not current_permissions:
-                            break
-                        
-                        permissions.extend(current_permissions)
-                        
-                        page_token = results.get('nextPageToken')
-                        if not page_token:
-                            break
-                        
-                    except HttpError as e:
-                        print(f"Error fetching permissions for drive {drive_name} ({drive_id}): {e}")
-                        break
+                def write_permissions(drive_id, permissions):
+                    # Write each permission as a CSV row
+                    for permission in permissions:
+                        permission_data = {
+                            'Drive ID': drive_id,
+                            'Drive Name': drive_names[drive_id],
+                            'Permission ID': permission.get('id', ''),
+                            'Type': permission.get('type', ''),
+                            'Email Address': permission.get('emailAddress', ''),
+                            'Role': permission.get('role', ''),
+                            'Display Name': permission.get('displayName', ''),
+                            'Domain': permission.get('domain', ''),
+                            'Expiration Time': permission.get('expirationTime', ''),
+                            'Deleted': permission.get('deleted', False),
+                            'Pending Owner': permission.get('pendingOwner', False)
+                        }
+                        writer.writerow(permission_data)
+                    return len(permissions)
                 
-                # Add each permission to the all_permissions list
-                for permission in permissions:
-                    permission_data = {
-                        'Drive ID': drive_id,
-                        'Drive Name': drive_name,
-                        'Permission ID': permission.get('id', ''),
-                        'Type': permission.get('type', ''),
-                        'Email Address': permission.get('emailAddress', ''),
-                        'Role': permission.get('role', ''),
-                        'Display Name': permission.get('displayName', ''),
-                        'Domain': permission.get('domain', ''),
-                        'Expiration Time': permission.get('expirationTime', ''),
-                        'Deleted': permission.get('deleted', False),
-                        'Pending Owner': permission.get('pendingOwner', False)
-                    }
-                    all_permissions.append(permission_data)
+                for drive_id, permissions in cached.items():
+                    permission_count += write_permissions(drive_id, permissions)
                 
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
+                # Complete listings are cached BATCH_SIZE drives at a time
+                to_cache = {}
+                for drive_id, permissions, error in self._iter_drive_permissions(
+                        [drive_id for drive_id in drive_names if drive_id not in cached]):
+                    if error is not None:
+                        print(f"Error fetching permissions for drive {drive_names[drive_id]} ({drive_id}): {error}")
+                    else:
+                        to_cache[drive_id] = permissions
+                    permission_count += write_permissions(drive_id, permissions)
+                    
+                    if len(to_cache) >= BATCH_SIZE:
+                        self._cache_put('drive_permissions', to_cache)
+                        to_cache = {}
+                self._cache_put('drive_permissions', to_cache)
             
-            # Create DataFrame and export to CSV
-            df = pd.DataFrame(all_permissions)
-            csv_path = os.path.join(self.output_dir, 'shared_drive_permissions_export.csv')
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            print(f"Exported {len(all_permissions)} permissions for {total_drives} shared drives to {csv_path}")
+            print(f"Exported {permission_count} permissions for {total_drives} shared drives to {csv_path}")
             
-            return df, csv_path
+            return permission_count, csv_path
             
         except Exception as e:
             print(f"Error exporting shared drive permissions: {e}")
-            return pd.DataFrame(), ""
+            return 0, ""
+    
+    def _iter_drive_permissions(self, drive_ids):
+        """
+        List the permissions of many Shared Drives using batched requests.
+        
+        Up to BATCH_SIZE permissions().list calls are sent per HTTP round trip.
+        Drives with more than one page of permissions are re-queued with their
+        next page token into a follow-up batch. Each drive is yielded as soon
+        as its listing finishes, so only the drives still being paged are
+        held in memory.
+        
+        Args:
+            drive_ids: List of Shared Drive IDs
+            
+        Yields:
+            Tuple of (drive_id, permissions, exception) for each drive, where
+            exception is the error that stopped its listing, or None
+        """
+        partial = {}
+        pending = [(drive_id, None) for drive_id in drive_ids]
+        label = "shared drives"
+        
+        while pending:
+            next_pending = []
+            chunks = [pending[start:start + BATCH_SIZE] for start in range(0, len(pending), BATCH_SIZE)]
+            fetched = 0
+            
+            # Batches are independent, so several are in flight at once
+            for results in self._executor.map(self._list_permissions_batch, chunks):
+                for drive_id, response, exception in results:
+                    permissions = partial.pop(drive_id, [])
+                    if exception is None:
+                        permissions.extend(response.get('permissions', []))
+                        if response.get('nextPageToken'):
+                            partial[drive_id] = permissions
+                            next_pending.append((drive_id, response['nextPageToken']))
+                            continue
+                    yield drive_id, permissions, exception
+                
+                fetched += len(results)
+                print(f"Fetched permissions for {fetched}/{len(pending)} {label}")
+            
+            pending = next_pending
+            label = "shared drives with more permissions"
+    
+    def _list_permissions_batch(self, chunk):
+        """
+        Send one batch of permissions().list calls on the calling thread's service.
+        
+        Calls that fail with throttling or transient server errors are
+        retried in a smaller batch with exponential backoff.
+        
+        Args:
+            chunk: List of (drive_id, page_token) pairs, at most BATCH_SIZE long
+            
+        Returns:
+            List of (drive_id, response, exception) tuples, one per call
+        """
+        drive_service = self._thread_drive_service()
+        results = []
+        attempt = 0
+        
+        while chunk:
+            retry = []
+            throttled = []
+            
+            def on_permissions(request_id, response, exception, chunk=chunk):
+                item = chunk[int(request_id)]
+                if exception is not None and _is_retryable(exception) and attempt < MAX_RETRIES:
+                    retry.append(item)
+                    throttled.append(exception.resp)
+                    return
+                results.append((item[0], response, exception))
+            
+            batch = drive_service.new_batch_http_request(callback=on_permissions)
+            for i, (drive_id, page_token) in enumerate(chunk):
+                # Every call in a batch counts against the quota
+                self.limiter.acquire()
+                batch.add(
+                    drive_service.permissions().list(
+                        fileId=drive_id,
+                        supportsAllDrives=True,
+                        fields=PERMISSION_FIELDS,
+                        pageToken=page_token
+                    ),
+                    request_id=str(i)
+                )
+            execute_with_backoff(batch)
+            
+            # Throttled calls are retried together after a backoff
+            if retry:
+                time.sleep(_retry_delay(throttled[-1], attempt))
+                attempt += 1
+            chunk = retry
+        
+        return results
     
-    def export_shared_drive_storage(self, drives_df=None):
+    def export_shared_drive_storage(self, drives=None):
         """
         Export storage usage for each Shared Drive to a CSV file.
         This requires additional API calls to get each drive's storage information.
         
         Args:
-            drives_df: Optional DataFrame with drives data from export_shared_drives().
-                       If not provided, will fetch drives first.
+            drives: Optional list of Shared Drive resources from export_shared_drives().
+                    If not provided, will fetch drives first.
         
         Returns:
             Tuple containing DataFrame with storage data and path to the CSV file
         """
         print("\nExporting Shared Drive storage usage...")
         
-        # If drives_df not provided, fetch drives first
-        if drives_df is None or drives_df.empty:
-            drives_df, _ = self.export_shared_drives()
+        # If drives not provided, fetch drives first
+        if not drives:
+            drives, _, _ = self.export_shared_drives()
         
-        if drives_df.empty:
+        if not drives:
             print("No shared drives available to export storage for.")
             return pd.DataFrame(), ""
         
         storage_data = []
         
         # For progress tracking
-        total_drives = len(drives_df)
         processed = 0
         
         try:
-            for _, drive in drives_df.iterrows():
-                drive_id = drive['Drive ID']
-                drive_name = drive['Drive Name']
-                
-                processed += 1
-                if processed % 5 == 0 or processed == total_drives:
-                    print(f"Processing shared drive storage {processed}/{total_drives}: {drive_name}")
-                
-                try:
-                    # Query "root" folder of the shared drive to get storage information
-                    file_metadata = self.drive_service.files().get(
-                        fileId=drive_id,
-                        supportsAllDrives=True,
-                        fields="id, name, storageQuota, size, quotaBytesUsed"
-                    ).execute()
-                    
-                    # Try to get total file count in the shared drive (this might be expensive for large drives)
-                    file_count_query = self.drive_service.files().list(
-                        corpora="drive",
-                        driveId=drive_id,
-                        includeItemsFromAllDrives=True, 
-                        supportsAllDrives=True,
-                        pageSize=1000,
-                        q="trashed=false",
-                        fields="files(id, mimeType)"
-                    ).execute()
-                    
-                    total_files = len(file_count_query.get('files', []))
-                    folder_count = sum(1 for file in file_count_query.get('files', []) if file.get('mimeType') == 'application/vnd.google-apps.folder')
-                    document_count = total_files - folder_count
-                    
-                    # Add storage information
-                    drive_storage = {
-                        'Drive ID': drive_id,
-                        'Drive Name': drive_name,
-                        'Storage Used (bytes)': file_metadata.get('quotaBytesUsed', 0),
-                        'Storage Used (MB)': int(file_metadata.get('quotaBytesUsed', 0)) / (1024 * 1024) if file_metadata.get('quotaBytesUsed') else 0,
-                        'Total Files': total_files,
-                        'Folder Count': folder_count,
-                        'Document Count': document_count
-                    }
-                    storage_data.append(drive_storage)
-                    
-                except HttpError as e:
-                    print(f"Error fetching storage for drive {drive_name} ({drive_id}): {e}")
-                    # Add a placeholder with the error
-                    drive_storage = {
-                        'Drive ID': drive_id,
-                        'Drive Name': drive_name,
-                        'Storage Used (bytes)': 0,
-                        'Storage Used (MB)': 0,
-                        'Total Files': 0,
-                        'Folder Count': 0,
-                        'Document Count': 0,
-                        'Error': str(e)
-                    }
-                    storage_data.append(drive_storage)
+            # Only drives without fresh cached storage data are fetched
+            cached = self._cache_get('drive_storage', [drive['id'] for drive in drives])
+            
+            # Item counts and usage only change with the drive's files, so a
+            # drive with an empty changes feed keeps its cached data at any age
+            if self.incremental:
+                unchanged = self._unchanged_drives([drive['id'] for drive in drives if drive['id'] not in cached])
+                cached.update(self._cache_get('drive_storage', unchanged, max_age=float('inf')))
+            
+            if cached:
+                print(f"Using cached storage data for {len(cached)} shared drives")
+            to_fetch = [drive for drive in drives if drive['id'] not in cached]
+            fetched = {}
+            if self.incremental:
+                self._save_start_page_tokens([drive['id'] for drive in to_fetch])
+            
+            # Each batch carries both storage calls for STORAGE_BATCH_DRIVES drives,
+            # and several batches are in flight at once
+            chunks = [to_fetch[start:start + STORAGE_BATCH_DRIVES]
+                      for start in range(0, len(to_fetch), STORAGE_BATCH_DRIVES)]
+            for chunk_storage in self._executor.map(self._get_storage_batch, chunks):
+                for drive_storage in chunk_storage:
+                    fetched[drive_storage['Drive ID']] = drive_storage
                 
-                # Small delay to avoid rate limiting
-                time.sleep(0.5)
+                processed += len(chunk_storage)
+                print(f"Processed shared drive storage {processed}/{len(to_fetch)}")
+            
+            self._cache_put('drive_storage', {
+                drive_id: drive_storage for drive_id, drive_storage in fetched.items() if 'Error' not in drive_storage
+            })
+            if self.incremental:
+                for drive_id, drive_storage in fetched.items():
+                    if 'Error' in drive_storage:
+                        self.state.pop(drive_id, None)
+                write_json(self.state_path, self.state)
+            
+            # Keep the listing's order and current drive names
+            for drive in drives:
+                drive_storage = fetched.get(drive['id'])
+                if drive_storage is None:
+                    drive_storage = dict(cached[drive['id']])
+                    drive_storage['Drive Name'] = drive.get('name', '')
+                storage_data.append(drive_storage)
             
             # Create DataFrame and export to CSV
             df = pd.DataFrame(storage_data)
@@ -395,6 +697,236 @@ class SharedDrivesExporter:
             print(f"Error exporting shared drive storage: {e}")
             return pd.DataFrame(), ""
     
+    def _get_storage_batch(self, drives):
+        """
+        Get storage usage and item counts for several Shared Drives.
+        
+        Each drive's root metadata and first page of items are requested in
+        one batch, so most drives cost a single round trip. Throttled calls are
+        retried in a follow-up batch; drives with more than one page of items
+        are then paged individually.
+        
+        Errors never escape, whether they hit a single call, the whole batch
+        or the paging of a drive's items, so one bad batch cannot abort the
+        storage export.
+        
+        Args:
+            drives: Shared Drive resources, at most STORAGE_BATCH_DRIVES long
+            
+        Returns:
+            List of dicts with each drive's storage data, or zeroes and an Error on failure
+        """
+        drive_service = self._thread_drive_service()
+        requests = {}
+        for drive in drives:
+            # Query "root" folder of the shared drive to get storage information
+            requests[f"meta:{drive['id']}"] = lambda drive_id=drive['id']: drive_service.files().get(
+                fileId=drive_id,
+                supportsAllDrives=True,
+                fields="quotaBytesUsed"
+            )
+            requests[f"items:{drive['id']}"] = lambda drive_id=drive['id']: self._list_drive_items(
+                drive_service, drive_id)
+        
+        try:
+            responses, errors = self._execute_batch(drive_service, requests)
+        except Exception as e:
+            # The batch itself failed, so every drive in it gets an Error row
+            responses, errors = {}, {request_id: e for request_id in requests}
+        
+        storage_data = []
+        for drive in drives:
+            drive_id, drive_name = drive['id'], drive.get('name', '')
+            error = errors.get(f"meta:{drive_id}") or errors.get(f"items:{drive_id}")
+            
+            try:
+                if error is not None:
+                    raise error
+                
+                # Count every item in the shared drive (this might be expensive for large drives)
+                file_metadata = responses[f"meta:{drive_id}"]
+                total_files, folder_count = self._count_drive_items(
+                    drive_service, drive_id, responses[f"items:{drive_id}"])
+                document_count = total_files - folder_count
+                
+                # Add storage information
+                drive_storage = {
+                    'Drive ID': drive_id,
+                    'Drive Name': drive_name,
+                    'Storage Used (bytes)': file_metadata.get('quotaBytesUsed', 0),
+                    'Storage Used (MB)': int(file_metadata.get('quotaBytesUsed', 0)) / (1024 * 1024) if file_metadata.get('quotaBytesUsed') else 0,
+                    'Total Files': total_files,
+                    'Folder Count': folder_count,
+                    'Document Count': document_count
+                }
+                
+            except Exception as e:
+                print(f"Error fetching storage for drive {drive_name} ({drive_id}): {e}")
+                # Add a placeholder with the error
+                drive_storage = {
+                    'Drive ID': drive_id,
+                    'Drive Name': drive_name,
+                    'Storage Used (bytes)': 0,
+                    'Storage Used (MB)': 0,
+                    'Total Files': 0,
+                    'Folder Count': 0,
+                    'Document Count': 0,
+                    'Error': str(e)
+                }
+            
+            storage_data.append(drive_storage)
+        
+        return storage_data
+    
+    def _execute_batch(self, drive_service, requests):
+        """
+        Send calls as one batch request, retrying throttled calls in follow-up batches.
+        
+        Args:
+            drive_service: Drive API service for the calling thread
+            requests: Dict mapping request IDs to callables that build each
+                      HttpRequest, at most BATCH_SIZE long
+            
+        Returns:
+            Tuple of (responses, errors) keyed by request ID
+        """
+        responses = {}
+        errors = {}
+        pending = list(requests)
+        attempt = 0
+        while pending:
+            retry = []
+            throttled = []
+            
+            def on_response(request_id, response, exception):
+                if exception is None:
+                    responses[request_id] = response
+                elif _is_retryable(exception) and attempt < MAX_RETRIES:
+                    retry.append(request_id)
+                    throttled.append(exception.resp)
+                else:
+                    errors[request_id] = exception
+            
+            batch = drive_service.new_batch_http_request(callback=on_response)
+            for request_id in pending:
+                # Every call in a batch counts against the quota
+                self.limiter.acquire()
+                batch.add(requests[request_id](), request_id=request_id)
+            execute_with_backoff(batch)
+            
+            if retry:
+                time.sleep(_retry_delay(throttled[-1], attempt))
+                attempt += 1
+            pending = retry
+        
+        return responses, errors
+    
+    def _batch_per_drive(self, drive_ids, make_request):
+        """
+        Make one call per drive, BATCH_SIZE calls per batch, on the worker pool.
+        
+        Args:
+            drive_ids: Shared Drive IDs
+            make_request: Callable taking (drive_service, drive_id) that builds the HttpRequest
+            
+        Returns:
+            Tuple of (responses, errors) keyed by drive ID
+        """
+        def run_chunk(chunk):
+            drive_service = self._thread_drive_service()
+            return self._execute_batch(drive_service, {
+                drive_id: (lambda drive_id=drive_id: make_request(drive_service, drive_id))
+                for drive_id in chunk
+            })
+        
+        responses = {}
+        errors = {}
+        chunks = [drive_ids[start:start + BATCH_SIZE] for start in range(0, len(drive_ids), BATCH_SIZE)]
+        for chunk_responses, chunk_errors in self._executor.map(run_chunk, chunks):
+            responses.update(chunk_responses)
+            errors.update(chunk_errors)
+        return responses, errors
+    
+    def _unchanged_drives(self, drive_ids):
+        """
+        Find drives whose items have not changed since their saved start page token.
+        
+        Args:
+            drive_ids: Shared Drive IDs to check
+            
+        Returns:
+            Set of drive IDs with no changes since the last incremental run
+        """
+        tokens = {drive_id: self.state[drive_id] for drive_id in drive_ids if drive_id in self.state}
+        responses, _ = self._batch_per_drive(list(tokens), lambda drive_service, drive_id: drive_service.changes().list(
+            driveId=drive_id,
+            pageToken=tokens[drive_id],
+            includeItemsFromAllDrives=True,
+            supportsAllDrives=True,
+            pageSize=1,
+            fields="changes(fileId)"
+        ))
+        return {drive_id for drive_id, response in responses.items() if not response.get('changes')}
+    
+    def _save_start_page_tokens(self, drive_ids):
+        """
+        Remember where each drive's changes feed stands before its items are counted.
+        
+        Args:
+            drive_ids: Shared Drive IDs about to be fetched
+        """
+        responses, _ = self._batch_per_drive(drive_ids, lambda drive_service, drive_id: drive_service.changes().getStartPageToken(
+            driveId=drive_id,
+            supportsAllDrives=True,
+            fields="startPageToken"
+        ))
+        for drive_id, response in responses.items():
+            self.state[drive_id] = response['startPageToken']
+    
+    def _list_drive_items(self, drive_service, drive_id, page_token=None):
+        """Build a files().list request for one page of a Shared Drive's items, with only their MIME types."""
+        return drive_service.files().list(
+            corpora="drive",
+            driveId=drive_id,
+            includeItemsFromAllDrives=True,
+            supportsAllDrives=True,
+            pageSize=1000,
+            q="trashed=false",
+            pageToken=page_token,
+            fields="nextPageToken, files(mimeType)"
+        )
+    
+    def _count_drive_items(self, drive_service, drive_id, results=None):
+        """
+        Count the items in a Shared Drive, following every page of results.
+        
+        Only the MIME type of each item is requested, which is all the count needs.
+        
+        Args:
+            drive_service: Drive API service for the calling thread
+            drive_id: Shared Drive ID
+            results: Optional first page of items, already fetched
+            
+        Returns:
+            Tuple of (total item count, folder count)
+        """
+        total_count = 0
+        folder_count = 0
+        page_token = None
+        
+        while True:
+            if results is None:
+                results = self._execute(self._list_drive_items(drive_service, drive_id, page_token))
+            
+            files = results.get('files', [])
+            total_count += len(files)
+            folder_count += sum(1 for file in files if file.get('mimeType') == FOLDER_MIME_TYPE)
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                return total_count, folder_count
+            results = None
+    
     def run_all_exports(self):
         """Run all export functions and return a summary of results."""
         print("\nStarting Google Shared Drives exports...")
@@ -402,15 +934,18 @@ class SharedDrivesExporter:
         results = {}
         
         # Export shared drives
-        drives_df, drives_path = self.export_shared_drives()
+        drives, drives_df, drives_path = self.export_shared_drives()
         results['Shared Drives'] = {'count': len(drives_df), 'path': drives_path}
         
-        # Export shared drive permissions
-        permissions_df, permissions_path = self.export_shared_drive_permissions(drives_df)
-        results['Shared Drive Permissions'] = {'count': len(permissions_df), 'path': permissions_path}
+        # Permissions and storage are independent, so export them concurrently;
+        # both share the worker pool and rate limit
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            permissions_future = executor.submit(self.export_shared_drive_permissions, drives)
+            storage_future = executor.submit(self.export_shared_drive_storage, drives)
+            permission_count, permissions_path = permissions_future.result()
+            storage_df, storage_path = storage_future.result()
         
-        # Export shared drive storage
-        storage_df, storage_path = self.export_shared_drive_storage(drives_df)
+        results['Shared Drive Permissions'] = {'count': permission_count, 'path': permissions_path}
         results['Shared Drive Storage'] = {'count': len(storage_df), 'path': storage_path}
         
         return results
@@ -424,6 +959,16 @@ def main():
     parser.add_argument('--debug', action='store_true', help='Enable debug mode with detailed output')
     parser.add_argument('--list-my-drives-only', action='store_true', 
                        help='Only list drives the admin user has direct access to (not using domain admin privileges)')
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f'Number of Drive batches or drives fetched concurrently (default: {DEFAULT_MAX_WORKERS})')
+    parser.add_argument('--requests-per-second', type=positive_rate, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help=f'Maximum sustained Drive API request rate (default: {DEFAULT_REQUESTS_PER_SECOND})')
+    parser.add_argument('--cache-ttl', type=int, default=DRIVE_CACHE_TTL,
+                        help=f'Seconds cached permissions and storage data are reused (default: {DRIVE_CACHE_TTL})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Reuse cached storage data for drives with no file changes since the last incremental run')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Ignore and do not update the {DRIVE_CACHE_FILE} cache')
     
     args = parser.parse_args()
     
@@ -432,7 +977,11 @@ def main():
         exporter = SharedDrivesExporter(
             service_account_file=args.service_account,
             admin_email=args.admin_email,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            max_workers=args.max_workers,
+            cache_ttl=0 if args.no_cache else args.cache_ttl,
+            requests_per_second=args.requests_per_second,
+            incremental=args.incremental
         )
         
         # Authenticate and initialize services
@@ -13,11 +13,109 @@ python list_shared_drives.py
 
 import os
 import json
+import time
+import random
 import argparse
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 from googleapiclient.errors import HttpError
 
+# HTTP statuses retried with exponential backoff
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30
+BACKOFF_JITTER = 0.5
+# Maximum number of calls per Drive batch request
+BATCH_SIZE = 100
+
+def execute_with_backoff(request):
+    """
+    Execute an API request, backing off only when the server asks for it.
+    
+    Throttling (429) and server errors are retried with capped exponential
+    backoff and jitter, preferring the Retry-After header when present.
+    Other errors are raised immediately.
+    
+    Args:
+        request: googleapiclient HttpRequest to execute
+        
+    Returns:
+        The API response
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status not in RETRYABLE_STATUSES or attempt == MAX_RETRIES:
+                raise
+            try:
+                delay = float(e.resp.get('retry-after', 0))
+            except (TypeError, ValueError):
+                delay = 0
+            if not delay:
+                delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * (1 + random.random() * BACKOFF_JITTER)
+            time.sleep(delay)
+
+def batch_get_drives(drive_service, drive_ids):
+    """
+    Resolve Shared Drive IDs using batched drives().get calls.
+    
+    Unlike advanced_shared_drive_finder.py this neither reads nor writes
+    the on-disk drive cache, since the point of the diagnostic is to check
+    live access. Up to BATCH_SIZE lookups are sent per HTTP round trip and
+    throttled lookups are retried with exponential backoff.
+    
+    Args:
+        drive_service: Authenticated Drive API service
+        drive_ids: Iterable of Shared Drive IDs to resolve
+        
+    Returns:
+        Tuple of (drives, errors), where drives is a list of drive resources
+        and errors maps each unresolved drive ID to its exception
+    """
+    drives = []
+    errors = {}
+    pending = list(drive_ids)
+    attempt = 0
+    
+    while pending:
+        retry = []
+        
+        for start in range(0, len(pending), BATCH_SIZE):
+            chunk = pending[start:start + BATCH_SIZE]
+            
+            def on_get(request_id, response, exception, chunk=chunk):
+                drive_id = chunk[int(request_id)]
+                
+                if exception is None:
+                    drives.append(response)
+                    return
+                
+                status = exception.resp.status if isinstance(exception, HttpError) else None
+                if status in RETRYABLE_STATUSES and attempt < MAX_RETRIES:
+                    retry.append(drive_id)
+                else:
+                    errors[drive_id] = exception
+            
+            batch = drive_service.new_batch_http_request(callback=on_get)
+            for i, drive_id in enumerate(chunk):
+                batch.add(
+                    drive_service.drives().get(
+                        driveId=drive_id,
+                        fields="id,name,createdTime"
+                    ),
+                    request_id=str(i)
+                )
+            execute_with_backoff(batch)
+        
+        if retry:
+            time.sleep(min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * (1 + random.random() * BACKOFF_JITTER))
+            attempt += 1
+        pending = retry
+    
+    return drives, errors
+
 def main():
     parser = argparse.ArgumentParser(description='Alternative Google Shared Drives Lister')
     parser.add_argument('--service-account', required=True, help='Path to service account JSON file')
@@ -42,8 +140,8 @@ def main():
         print(f"Authenticated as {args.admin_email}")
         print(f"Service account: {creds.service_account_email}")
         
-        # Build the Drive API service
-        drive_service = build('drive', 'v3', credentials=creds)
+        # Build the Drive API service from the bundled discovery document
+        drive_service = build('drive', 'v3', credentials=creds, static_discovery=True, cache_discovery=False)
         
         # Test API access
         print("\nTesting Drive API access...")
@@ -96,13 +194,11 @@ def main():
             # Try to get details for each driveId
             if drive_ids:
                 print("\nAttempting to get details for each Shared Drive:")
-                for drive_id in drive_ids:
-                    try:
-                        # Get drive details
-                        drive = drive_service.drives().get(driveId=drive_id, fields="id, name").execute()
-                        print(f" - {drive.get('name')} (ID: {drive.get('id')})")
-                    except HttpError as e:
-                        print(f" - Error getting drive with ID {drive_id}: {e}")
+                drives, errors = batch_get_drives(drive_service, drive_ids)
+                for drive in drives:
+                    print(f" - {drive.get('name')} (ID: {drive.get('id')})")
+                for drive_id, error in errors.items():
+                    print(f" - Error getting drive with ID {drive_id}: {error}")
             
         except HttpError as e:
             print(f"ERROR with alternative approach: {e}")
@@ -11,29 +11,92 @@ python test_service_account.py --service-account your-key.json --admin-email adm
 
 import os
 import sys
+import re
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
-from googleapiclient.errors import HttpError
+from googleapiclient.errors import HttpError, UnknownApiNameOrVersion
+
+# Identifier fields shown from the service account key file
+SA_INFO_FIELDS = ('client_email', 'client_id', 'project_id')
+# Matches one of SA_INFO_FIELDS and its JSON string value, so private_key is never decoded
+SA_INFO_PATTERN = re.compile(rb'"(%s)"\s*:\s*("(?:[^"\\]|\\.)*")' % '|'.join(SA_INFO_FIELDS).encode())
+
+# Guidance printed when any scope test fails, formatted with the service account's client_id
+TROUBLESHOOTING_FAILED = """Some tests failed. Check the following:
+1. In Google Admin Console (admin.google.com):
+   - Navigate to: Security > API Controls > Domain-wide Delegation
+   - Ensure this client ID is listed: {client_id}
+   - Ensure ALL these scopes are added (copy the entire line):
+     https://www.googleapis.com/auth/admin.directory.user.readonly,https://www.googleapis.com/auth/drive,https://www.googleapis.com/auth/drive.readonly,https://www.googleapis.com/auth/drive.metadata.readonly
+2. In Google Cloud Console (console.cloud.google.com):
+   - Navigate to: IAM & Admin > Service Accounts
+   - Ensure the service account is enabled
+   - Navigate to: APIs & Services > Dashboard
+   - Ensure 'Google Drive API' and 'Admin SDK' are enabled
+3. In Domain Settings:
+   - Ensure Shared Drives are enabled for your organization"""
+
+# Guidance printed when every scope test passes
+TROUBLESHOOTING_PASSED = """All tests passed! Your service account is correctly configured.
+If you're still having issues with Shared Drives, it's possible that:
+1. There are no Shared Drives in your organization
+2. The admin user doesn't have access to any Shared Drives
+3. There might be organizational policies restricting access"""
+
+class Scenario(NamedTuple):
+    """A scope to test, the API it grants access to and the call that checks it."""
+    name: str
+    scope: str
+    api_name: str
+    api_version: str
+    test_func: Callable
+
+def build_service(api_name, api_version, credentials):
+    """Build an API service from the discovery document bundled with google-api-python-client."""
+    try:
+        return build(api_name, api_version, credentials=credentials, static_discovery=True, cache_discovery=False)
+    except UnknownApiNameOrVersion:
+        # Not bundled with this client version, so fetch it from the discovery service
+        return build(api_name, api_version, credentials=credentials, static_discovery=False)
 
 def test_scope(credentials, scope_name, api_name, api_version, test_function):
-    """Test a specific API scope."""
-    print(f"\n----- Testing {scope_name} -----")
+    """Test a specific API scope, returning whether it passed and the lines to report."""
+    lines = [f"\n----- Testing {scope_name} -----"]
     try:
         # Create service with specific credentials
-        service = build(api_name, api_version, credentials=credentials)
+        service = build_service(api_name, api_version, credentials)
         
         # Run the test function
         result = test_function(service)
-        print(f"✅ SUCCESS: {result}")
-        return True
+        lines.append(f"✅ SUCCESS: {result}")
+        return True, lines
     except HttpError as e:
-        print(f"❌ ERROR: {e}")
-        return False
+        lines.append(f"❌ ERROR: {e}")
+        return False, lines
     except Exception as e:
-        print(f"❌ UNEXPECTED ERROR: {type(e).__name__}: {e}")
-        return False
+        lines.append(f"❌ UNEXPECTED ERROR: {type(e).__name__}: {e}")
+        return False, lines
+
+def run_scenario(scenario, base_creds):
+    """Run one scope test with credentials for just its scope, returning whether it passed and its report lines."""
+    try:
+        # Narrow the already loaded delegated credentials to just this scope
+        creds = base_creds.with_scopes([scenario.scope])
+        
+        # Test the scope
+        return test_scope(
+            creds, 
+            scenario.name, 
+            scenario.api_name, 
+            scenario.api_version, 
+            scenario.test_func
+        )
+    except Exception as e:
+        return False, [f"❌ ERROR setting up credentials: {e}"]
 
 def test_directory_users(service):
     """Test Directory API users listing."""
@@ -68,14 +131,13 @@ def test_drive_teamdrives(service):
         raise
 
 def get_service_account_info(service_account_file):
-    """Get service account information from the key file."""
-    with open(service_account_file, 'r') as f:
-        data = json.load(f)
-    return {
-        'client_email': data.get('client_email', 'Unknown'),
-        'client_id': data.get('client_id', 'Unknown'),
-        'project_id': data.get('project_id', 'Unknown')
-    }
+    """Get service account information from the key file, without parsing the private key."""
+    with open(service_account_file, 'rb') as f:
+        raw = f.read()
+    info = dict.fromkeys(SA_INFO_FIELDS, 'Unknown')
+    for key, value in SA_INFO_PATTERN.findall(raw):
+        info[key.decode()] = json.loads(value)
+    return info
 
 def main():
     parser = argparse.ArgumentParser(description='Test Google Service Account Authentication')
@@ -94,91 +156,65 @@ def main():
     print("==============================================")
     
     # Define the scopes to test
-    test_scenarios = [
-        {
-            'name': "Admin Directory API (Users)",
-            'scope': 'https://www.googleapis.com/auth/admin.directory.user.readonly',
-            'api_name': 'admin',
-            'api_version': 'directory_v1',
-            'test_func': test_directory_users
-        },
-        {
-            'name': "Drive API Basic Access",
-            'scope': 'https://www.googleapis.com/auth/drive.metadata.readonly',
-            'api_name': 'drive',
-            'api_version': 'v3',
-            'test_func': test_drive_about
-        },
-        {
-            'name': "Drive API Files",
-            'scope': 'https://www.googleapis.com/auth/drive.readonly',
-            'api_name': 'drive',
-            'api_version': 'v3',
-            'test_func': test_drive_files
-        },
-        {
-            'name': "Drive API Shared Drives",
-            'scope': 'https://www.googleapis.com/auth/drive',
-            'api_name': 'drive',
-            'api_version': 'v3',
-            'test_func': test_drive_teamdrives
-        }
-    ]
+    test_scenarios = (
+        Scenario(
+            name="Admin Directory API (Users)",
+            scope='https://www.googleapis.com/auth/admin.directory.user.readonly',
+            api_name='admin',
+            api_version='directory_v1',
+            test_func=test_directory_users
+        ),
+        Scenario(
+            name="Drive API Basic Access",
+            scope='https://www.googleapis.com/auth/drive.metadata.readonly',
+            api_name='drive',
+            api_version='v3',
+            test_func=test_drive_about
+        ),
+        Scenario(
+            name="Drive API Files",
+            scope='https://www.googleapis.com/auth/drive.readonly',
+            api_name='drive',
+            api_version='v3',
+            test_func=test_drive_files
+        ),
+        Scenario(
+            name="Drive API Shared Drives",
+            scope='https://www.googleapis.com/auth/drive',
+            api_name='drive',
+            api_version='v3',
+            test_func=test_drive_teamdrives
+        )
+    )
+    
+    # Load the key file once; each scenario derives its own single-scope copy
+    try:
+        base_creds = service_account.Credentials.from_service_account_file(
+            args.service_account,
+            scopes=[scenario.scope for scenario in test_scenarios]
+        ).with_subject(args.admin_email)
+    except Exception as e:
+        print(f"❌ ERROR setting up credentials: {e}")
+        sys.exit(1)
     
-    # Run tests for each scope independently
+    # Run tests for each scope independently and in parallel, reporting them in order
     results = {}
-    for scenario in test_scenarios:
-        try:
-            # Create credentials for just this scope
-            creds = service_account.Credentials.from_service_account_file(
-                args.service_account, 
-                scopes=[scenario['scope']]
-            )
-            creds = creds.with_subject(args.admin_email)
-            
-            # Test the scope
-            success = test_scope(
-                creds, 
-                scenario['name'], 
-                scenario['api_name'], 
-                scenario['api_version'], 
-                scenario['test_func']
-            )
-            results[scenario['name']] = success
-        except Exception as e:
-            print(f"❌ ERROR setting up credentials: {e}")
-            results[scenario['name']] = False
+    with ThreadPoolExecutor(max_workers=len(test_scenarios)) as executor:
+        futures = [executor.submit(run_scenario, scenario, base_creds) for scenario in test_scenarios]
+        for scenario, future in zip(test_scenarios, futures):
+            success, lines = future.result()
+            print('\n'.join(lines))
+            results[scenario.name] = success
     
     # Summary
     print("\n===== TEST SUMMARY =====")
-    all_success = True
-    for name, success in results.items():
-        status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status} - {name}")
-        if not success:
-            all_success = False
+    print('\n'.join(f"{'✅ PASS' if success else '❌ FAIL'} - {name}" for name, success in results.items()))
     
     print("\n===== TROUBLESHOOTING GUIDANCE =====")
-    if not all_success:
-        print("Some tests failed. Check the following:")
-        print("1. In Google Admin Console (admin.google.com):")
-        print("   - Navigate to: Security > API Controls > Domain-wide Delegation")
-        print("   - Ensure this client ID is listed:", sa_info['client_id'])
-        print("   - Ensure ALL these scopes are added (copy the entire line):")
-        print("     https://www.googleapis.com/auth/admin.directory.user.readonly,https://www.googleapis.com/auth/drive,https://www.googleapis.com/auth/drive.readonly,https://www.googleapis.com/auth/drive.metadata.readonly")
-        print("2. In Google Cloud Console (console.cloud.google.com):")
-        print("   - Navigate to: IAM & Admin > Service Accounts")
-        print("   - Ensure the service account is enabled")
-        print("   - Navigate to: APIs & Services > Dashboard")
-        print("   - Ensure 'Google Drive API' and 'Admin SDK' are enabled")
-        print("3. In Domain Settings:")
-        print("   - Ensure Shared Drives are enabled for your organization")
+    if not all(results.values()):
+        print(TROUBLESHOOTING_FAILED.format(client_id=sa_info['client_id']))
     else:
-        print("All tests passed! Your service account is correctly configured.")
-        print("If you're still having issues with Shared Drives, it's possible that:")
-        print("1. There are no Shared Drives in your organization")
-        print("2. The admin user doesn't have access to any Shared Drives")
-        print("3. There might be organizational policies restricting access")
+        print(TROUBLESHOOTING_PASSED)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file